@@ -1,12 +1,17 @@
 """Day 11: Dumbo Octopus"""
 
 
+import random
 from itertools import count
 from pathlib import Path
 
 
 PATH = Path(__file__).parent
 
+FLASH = 10
+INCREASE = bytes(range(1, 256)) + bytes(1)
+RESET = bytes(range(FLASH)) + bytes(256 - FLASH)
+
 
 class DumboOctopuses:
 
@@ -71,6 +76,93 @@ class DumboOctopuses:
                     yield adj_row, adj_col
 
 
+class OctopusBatch:
+    """Independent grids of octopuses of the same shape stepped together.
+
+    The energy levels of all grids are kept in one flat bytearray, one
+    grid after the other, and the neighbors of every cell of a grid are
+    looked up in a table computed once. A step increases all levels at
+    once and resolves the flashes with a worklist of the cells reaching
+    the flash level.
+    """
+
+    def __init__(self, grids):
+        self.rows = len(grids[0])
+        self.cols = len(grids[0][0])
+        self.size = self.rows * self.cols
+        self.levels = bytearray(
+            level for grid in grids for row in grid for level in row
+        )
+        self.steps = 0
+        self.flashes = [0] * len(grids)
+        self._neighbors = [
+            tuple(
+                (row + i) * self.cols + col + j
+                for i in (-1, 0, 1)
+                for j in (-1, 0, 1)
+                if (i or j)
+                and 0 <= row + i < self.rows
+                and 0 <= col + j < self.cols
+            )
+            for row in range(self.rows)
+            for col in range(self.cols)
+        ]
+
+    def __len__(self):
+        return len(self.levels) // self.size
+
+    def step(self):
+        """Run a step on all grids and return the flashes of each."""
+        levels = self.levels.translate(INCREASE)
+        neighbors = self._neighbors
+        size = self.size
+        stack = []
+        index = levels.find(FLASH)
+        while index != -1:
+            stack.append(index)
+            index = levels.find(FLASH, index + 1)
+
+        while stack:
+            index = stack.pop()
+            base = index - index % size
+            for neighbor in neighbors[index - base]:
+                neighbor += base
+                levels[neighbor] += 1
+                if levels[neighbor] == FLASH:
+                    stack.append(neighbor)
+
+        self.levels = levels.translate(RESET)
+        self.steps += 1
+        flashes = [
+            self.levels.count(0, start, start + size)
+            for start in range(0, len(self.levels), size)
+        ]
+        self.flashes = [
+            total + new for total, new in zip(self.flashes, flashes)
+        ]
+        return flashes
+
+    def synchronized(self, max_steps):
+        """Return the first step at which all octopuses of each grid
+        flash, None for the grids not synchronized within `max_steps`.
+        """
+        result = [None] * len(self)
+        pending = len(self)
+        while pending and self.steps < max_steps:
+            for i, flashes in enumerate(self.step()):
+                if flashes == self.size and result[i] is None:
+                    result[i] = self.steps
+                    pending -= 1
+
+        return result
+
+
+def generate(rows, cols, seed=None):
+    """Generate a random grid of energy levels."""
+    rng = random.Random(seed)
+    return [[rng.randrange(10) for _ in range(cols)] for _ in range(rows)]
+
+
 def parse(path):
     with path.open(encoding='utf-8') as input_file:
         return [
@@ -95,3 +187,31 @@ def test_part2():
             break
 
     assert step == 220
+
+
+def test_batch_part1():
+    octopuses = OctopusBatch([parse(PATH / 'input')])
+    for _ in range(100):
+        octopuses.step()
+
+    assert octopuses.flashes == [1652]
+
+
+def test_batch_part2():
+    octopuses = OctopusBatch([parse(PATH / 'example'), parse(PATH / 'input')])
+    assert octopuses.synchronized(max_steps=1000) == [195, 220]
+
+
+def test_batch_generated():
+    grids = [generate(10, 10, seed) for seed in range(20)]
+    expected = []
+    for grid in grids:
+        octopuses = DumboOctopuses([row[:] for row in grid])
+        for step in range(1, 1001):
+            if next(octopuses).synchronized:
+                expected.append(step)
+                break
+        else:
+            expected.append(None)
+
+    assert OctopusBatch(grids).synchronized(max_steps=1000) == expected
@@ -5,6 +5,8 @@ import math
 from heapq import heappush, heappop
 from pathlib import Path
 
+from aoc.search import dijkstra
+
 
 PATH = Path(__file__).parent
 
@@ -52,6 +54,51 @@ class RiskMap:
         return new_data
 
 
+class TiledRiskMap:
+    """A risk map enlarged by repeating the tile `factor` times in both
+    directions, with the risk levels computed on demand from the tile
+    instead of copied. Positions are flat indices, row by row.
+    """
+
+    def __init__(self, data, factor=1):
+        self.tile = data
+        self.rows = len(data)
+        self.cols = len(data[0])
+        self.height = self.rows * factor
+        self.width = self.cols * factor
+
+    def __len__(self):
+        return self.height * self.width
+
+    def __getitem__(self, index):
+        tile_i, i = divmod(index // self.width, self.rows)
+        tile_j, j = divmod(index % self.width, self.cols)
+        return 1 + (self.tile[i][j] + tile_i + tile_j - 1) % 9
+
+    def neighbors(self, index):
+        """Iterate over the adjacent positions and their risk levels."""
+        i, j = divmod(index, self.width)
+        if i > 0:
+            yield index - self.width, self[index - self.width]
+        if i < self.height - 1:
+            yield index + self.width, self[index + self.width]
+        if j > 0:
+            yield index - 1, self[index - 1]
+        if j < self.width - 1:
+            yield index + 1, self[index + 1]
+
+    def lowest_risk(self):
+        """Return the lowest total risk from the top left to the bottom
+        right position, using a bucket queue as risk levels are 1 to 9.
+        """
+        end = len(self) - 1
+        result = dijkstra(
+            self.neighbors, [0], len(self),
+            is_target=end.__eq__, max_weight=9,
+        )
+        return result.distances[end]
+
+
 class Cavern:
 
     def __init__(self, cavern):
@@ -122,8 +169,9 @@ def test_part1():
     print()
     print(cavern)
     assert risk_level == 361
+    assert TiledRiskMap(parse(PATH / 'input')).lowest_risk() == 361
 
 
 def test_part2():
-    risk_map = RiskMap(parse(PATH / 'input'), factor=5)
-    assert Cavern(risk_map).find_lowest_risk(start=(0, 0)) == 2838
+    assert TiledRiskMap(parse(PATH / 'example'), factor=5).lowest_risk() == 315
+    assert TiledRiskMap(parse(PATH / 'input'), factor=5).lowest_risk() == 2838
@@ -10,6 +10,7 @@ PATH = Path(__file__).parent
 
 LIGHT = '#'
 DARK = '.'
+PIXELS = bytes.maketrans(b'\x00\x01', (DARK + LIGHT).encode())
 
 
 class TrenchMap:
@@ -91,6 +92,82 @@ class TrenchMap:
         )
 
 
+class ArrayTrenchMap:
+    """Trench map enhancing the whole image at once.
+
+    The image is kept as rows of 0 and 1 bytes, and every pixel outside
+    of it has the background value. For an enhancement each pixel gets
+    a 16-bit lane of one big integer, so adding up the nine shifted
+    copies of the image gives the enhancement indices of all pixels.
+    Their low bytes are translated with both halves of the enhancement
+    table, and the high bit of each index picks between the two.
+    """
+
+    def __init__(self, enhancement, image):
+        table = bytes(int(pixel == LIGHT) for pixel in enhancement)
+        self._dark, self._light = table[:256], table[256:]
+        self.background = 0
+        rows = [i for i, _ in image]
+        cols = [j for _, j in image]
+        self.rows = [
+            bytes(
+                int((i, j) in image)
+                for j in range(min(cols), max(cols) + 1)
+            )
+            for i in range(min(rows), max(rows) + 1)
+        ]
+
+    def __str__(self):
+        return '\n'.join(row.translate(PIXELS).decode() for row in self.rows)
+
+    def __len__(self):
+        if self.background:
+            return math.inf
+        return sum(row.count(1) for row in self.rows)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        width = len(self.rows[0]) + 4
+        edge = bytes([self.background]) * 2
+        blank = bytes([self.background]) * width
+        cells = b''.join([
+            blank, blank, *(edge + row + edge for row in self.rows),
+            blank, blank,
+        ])
+
+        lanes = bytearray(2 * len(cells))
+        lanes[::2] = cells
+        image = int.from_bytes(lanes, 'little')
+        indices = 0
+        bit = 8
+        for i, j in product((-1, 0, 1), repeat=2):
+            shift = 16 * (i * width + j)
+            shifted = image >> shift if shift >= 0 else image << -shift
+            indices += shifted << bit
+            bit -= 1
+
+        indices &= (1 << 8 * len(lanes)) - 1
+        lanes = indices.to_bytes(len(lanes), 'little')
+        low = lanes[::2]
+        dark = int.from_bytes(low.translate(self._dark), 'little')
+        light = int.from_bytes(low.translate(self._light), 'little')
+        high = int.from_bytes(lanes[1::2], 'little')
+        cells = (dark ^ ((dark ^ light) & high)).to_bytes(len(cells), 'little')
+
+        # the pixels next to the image are the only new ones, the pixels
+        # on the outer edge have wrapped around and are left out
+        self.rows = [
+            cells[start + 1:start + width - 1]
+            for start in range(width, len(cells) - width, width)
+        ]
+        self.background = (
+            self._light[-1] if self.background else self._dark[0]
+        )
+        return self
+
+
 def parse(path):
     with path.open(encoding='utf-8') as input_file:
         enhancement = next(input_file).strip()
@@ -136,3 +213,25 @@ def test_part2():
         next(trench_map)
 
     assert len(trench_map) == 19492
+
+
+def test_array_example():
+    trench_map = ArrayTrenchMap(*parse(PATH / 'example'))
+    for _ in range(2):
+        next(trench_map)
+    assert len(trench_map) == 35
+
+    for _ in range(48):
+        next(trench_map)
+    assert len(trench_map) == 3351
+
+
+def test_array_part2():
+    trench_map = ArrayTrenchMap(*parse(PATH / 'input'))
+    for _ in range(2):
+        next(trench_map)
+    assert len(trench_map) == 5301
+
+    for _ in range(48):
+        next(trench_map)
+    assert len(trench_map) == 19492
@@ -60,6 +60,78 @@ class SeaCucumber:
         return next(self._iterator)
 
 
+class BitboardSeaCucumber:
+    """Sea cucumbers with each herd kept as the bits of one integer.
+
+    The cell at row i and column j is bit i * width + j, so a step of
+    a herd is rolling its bits one column or one row with wrap around
+    and masking the rolled bits with the empty cells.
+    """
+
+    def __init__(self, data):
+        self.height = len(data)
+        self.width = len(data[0])
+        self.east = self._herd(data, EAST)
+        self.south = self._herd(data, SOUTH)
+        self.steps = 0
+
+        size = self.height * self.width
+        self._board = (1 << size) - 1
+        self._first_column = sum(
+            1 << i for i in range(0, size, self.width)
+        )
+        self._last_column = self._first_column << self.width - 1
+
+    def __repr__(self):
+        return '\n'.join(
+            ''.join(
+                EAST if self.east >> k & 1
+                else SOUTH if self.south >> k & 1
+                else EMPTY
+                for k in range(start, start + self.width)
+            )
+            for start in range(0, self.height * self.width, self.width)
+        )
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        width = self.width
+        empty = self._board & ~(self.east | self.south)
+        moved = (
+            (self.east & ~self._last_column) << 1
+            | (self.east & self._last_column) >> width - 1
+        ) & empty
+        self.east ^= moved | (
+            (moved & ~self._first_column) >> 1
+            | (moved & self._first_column) << width - 1
+        )
+
+        rows = width * (self.height - 1)
+        empty = self._board & ~(self.east | self.south)
+        moved_south = (
+            (self.south << width) & self._board
+            | self.south >> rows
+        ) & empty
+        self.south ^= moved_south | (
+            moved_south >> width | (moved_south << rows) & self._board
+        )
+
+        self.steps += 1
+        if not moved and not moved_south:
+            raise StopIteration
+        return self
+
+    def _herd(self, data, kind):
+        return sum(
+            1 << i * self.width + j
+            for i, row in enumerate(data)
+            for j, char in enumerate(row)
+            if char == kind
+        )
+
+
 def parse(path):
     with path.open(encoding='utf-8') as input_file:
         return [list(line.rstrip()) for line in input_file]
@@ -111,3 +183,32 @@ def test_input():
     for _ in sea_cucumber:
         pass
     assert sea_cucumber.steps == 441
+
+
+def test_bitboard_example3():
+    sea_cucumber = BitboardSeaCucumber(parse(PATH / 'example3'))
+    for _ in range(4):
+        next(sea_cucumber)
+    assert str(sea_cucumber) == (
+        '>......\n'
+        '..v....\n'
+        '..>.v..\n'
+        '.>.v...\n'
+        '...>...\n'
+        '.......\n'
+        'v......'
+    )
+
+
+def test_bitboard_example4():
+    sea_cucumber = BitboardSeaCucumber(parse(PATH / 'example4'))
+    for _ in sea_cucumber:
+        pass
+    assert sea_cucumber.steps == 58
+
+
+def test_bitboard_input():
+    sea_cucumber = BitboardSeaCucumber(parse(PATH / 'input'))
+    for _ in sea_cucumber:
+        pass
+    assert sea_cucumber.steps == 441
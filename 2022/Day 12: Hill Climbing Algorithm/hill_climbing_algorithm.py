@@ -1,7 +1,15 @@
 """Day 12: Hill Climbing Algorithm"""
 
 
-from collections import deque
+import sys
+from pathlib import Path
+
+if __name__ == '__main__':
+    # run as a script, so make the shared aoc package importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from aoc.grid import Grid
+from aoc.search import bfs, path
 
 
 def parse(filename):
@@ -11,49 +19,33 @@ def parse(filename):
             yield line.rstrip()
 
 
-def find_path(heightmap, *start):
-    """Return a path as a list of positions from start to end."""
-    preds, end = _bfs(heightmap, *start)
-    path = [end]
-    while (pred := preds[end]):
-        path.append(pred)
-        end = pred
-
-    return list(reversed(path))
-
-
-def _bfs(heightmap, *start):
-    max_x = len(heightmap)
-    max_y = len(heightmap[0])
-
-    queue = deque([(*s, 'a') for s in start])
-    preds = {s: None for s in start}
+# the sentinel border is higher than any elevation
+ELEVATIONS = bytes.maketrans(b'SE', b'az')
 
-    while queue:
-        pos_x, pos_y, curr_height = queue.popleft()
-        max_height = chr(ord(curr_height) + 1)
-
-        for d_x, d_y in ((0, 1), (0, -1), (1, 0), (-1, 0)):
-            new_x = pos_x + d_x
-            new_y = pos_y + d_y
-
-            if (_out_of_bound(new_x, new_y, max_x, max_y)
-                    or (new_x, new_y) in preds
-                    or (new_height := heightmap[new_x][new_y]) > max_height
-                    or new_height == 'E' and curr_height < 'y'):
-                continue
-
-            preds[new_x, new_y] = pos_x, pos_y
-            if new_height == 'E':
-                return preds, (new_x, new_y)
-
-            queue.append((new_x, new_y, new_height))
-
-    raise RuntimeError(f'Path not found: {start}')
 
+def find_path(heightmap, *start):
+    """Return a path as a list of positions from start to end."""
+    grid = Grid(heightmap, sentinel=255)
+    elevations = grid.cells.translate(ELEVATIONS)
+    end = grid.find('E')
+
+    def _neighbors(index):
+        max_height = elevations[index] + 1
+        for offset in grid.offsets4:
+            if elevations[index + offset] <= max_height:
+                yield index + offset
+
+    result = bfs(
+        _neighbors,
+        [grid.index(*s) for s in start],
+        len(grid.cells),
+        is_target=end.__eq__,
+        parents=True,
+    )
+    if result.target is None:
+        raise RuntimeError(f'Path not found: {start}')
 
-def _out_of_bound(pos_x, pos_y, height, width):
-    return pos_x < 0 or pos_x >= height or pos_y < 0 or pos_y >= width
+    return [grid.position(index) for index in path(result.parents, end)]
 
 
 def positions(heightmap, height):
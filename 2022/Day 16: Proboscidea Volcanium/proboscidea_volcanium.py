@@ -3,7 +3,7 @@
 
 from collections import deque
 from functools import cache
-from itertools import combinations
+from operator import itemgetter
 
 
 def parse(filename):
@@ -67,41 +67,100 @@ def predecessors(preds, node):
         node = pred
 
 
+def best_pressures(graph, rates, minutes, start_valve='AA'):
+    """Return the positive-rate valves and a dict of bitmask/pressure
+    pairs with the most pressure that can be released by opening
+    exactly the valves in each reachable bitmask.
+    """
+    valves = [v for v, rate in rates.items() if rate > 0 and v != start_valve]
+    dists = get_distances(graph, set(valves) | {start_valve})
+    matrix = [
+        [dists[src][dst] + 1 if src != dst else 0 for dst in valves]
+        for src in valves + [start_valve]
+    ]
+    flows = [rates[valve] for valve in valves]
+
+    best = {}
+    stack = [(len(valves), minutes, 0, 0)]
+    while stack:
+        index, minutes, mask, pressure = stack.pop()
+        if pressure > best.get(mask, -1):
+            best[mask] = pressure
+
+        for other, time in enumerate(matrix[index]):
+            bit = 1 << other
+            if mask & bit or (remaining := minutes - time) <= 0:
+                continue
+
+            stack.append((
+                other,
+                remaining,
+                mask | bit,
+                pressure + remaining * flows[other],
+            ))
+
+    return valves, best
+
+
+def subset_max(best, size):
+    """Return a table of the most pressure released by opening any
+    subset of the valves in each bitmask.
+    """
+    table = [0] * (1 << size)
+    for mask, pressure in best.items():
+        table[mask] = pressure
+
+    for i in range(size):
+        bit = 1 << i
+        for mask in range(1 << size):
+            if mask & bit and table[mask ^ bit] > table[mask]:
+                table[mask] = table[mask ^ bit]
+
+    return table
+
+
 def most_pressure(graph, rates, minutes, start_valve='AA', workers=1):
     """Return the most pressure that can be released."""
-    def _find_most(valves, workers):
-        if workers < 1:
-            return 0
+    @cache
+    def _find_most(available, workers):
+        if workers == 1:
+            return table[available]
 
+        # workers are interchangeable, so it is enough to try each mask
+        # as the one of the worker releasing the most pressure, which
+        # bounds what every other worker can release
         most = 0
-        for partial_valves in combinations(valves, len(valves) // workers):
-            partial_valves = frozenset(partial_valves)
-            pressure1 = _do_find_most(start_valve, partial_valves, minutes)
-            pressure2 = _find_most(valves - partial_valves, workers - 1)
-            most = max(most, pressure1 + pressure2)
+        for mask, pressure in _iter_ranked(available):
+            if pressure + (workers - 1) * min(
+                    pressure, table[available]) <= most:
+                break
+
+            rest = available ^ mask
+            if mask & ~available or pressure + (workers - 1) * min(
+                    pressure, table[rest]) <= most:
+                continue
+
+            most = max(most, pressure + _find_most(rest, workers - 1))
 
         return most
 
-    @cache
-    def _do_find_most(start_valve, valves, minutes):
-        if minutes < 2:
-            return 0
+    def _iter_ranked(available):
+        if 1 << available.bit_count() >= len(ranked):
+            return ranked
 
-        most = 0
-        for valve in valves:
-            time = dists[start_valve][valve] + 1
-            pressure = (
-                (minutes - time)
-                * rates[valve]
-                + _do_find_most(valve, valves - {valve}, minutes - time)
-            )
-            most = max(most, pressure)
+        submasks = []
+        mask = available
+        while mask:
+            if mask in best:
+                submasks.append((mask, best[mask]))
+            mask = (mask - 1) & available
 
-        return most
+        return sorted(submasks, key=itemgetter(1), reverse=True)
 
-    valves = {valve for valve, rate in rates.items() if rate > 0}
-    dists = get_distances(graph, valves | {start_valve})
-    return _find_most(valves - {start_valve}, workers)
+    valves, best = best_pressures(graph, rates, minutes, start_valve)
+    table = subset_max(best, len(valves))
+    ranked = sorted(best.items(), key=itemgetter(1), reverse=True)
+    return _find_most((1 << len(valves)) - 1, workers)
 
 
 def main():
@@ -1,43 +1,30 @@
 """Day 17: Pyroclastic Flow"""
 
 
-from itertools import cycle
-
-
-SYMBOL_TO_SHAPE = {
-    '-': lambda h: (
-        (3, h + 4),
-        (4, h + 4),
-        (5, h + 4),
-        (6, h + 4),
-    ),
-    '+': lambda h: (
-        (3, h + 5),
-        (4, h + 4),
-        (4, h + 5),
-        (4, h + 6),
-        (5, h + 5),
-    ),
-    'j': lambda h: (
-        (3, h + 4),
-        (4, h + 4),
-        (5, h + 4),
-        (5, h + 5),
-        (5, h + 6),
-    ),
-    'l': lambda h: (
-        (3, h + 4),
-        (3, h + 5),
-        (3, h + 6),
-        (3, h + 7),
-    ),
-    'o': lambda h: (
-        (3, h + 4),
-        (3, h + 5),
-        (4, h + 4),
-        (4, h + 5),
-    ),
-}
+import sys
+from itertools import chain, count
+from operator import itemgetter
+from pathlib import Path
+
+if __name__ == '__main__':
+    # run as a script, so make the shared aoc package importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from aoc import cycles
+
+
+WIDTH = 7
+FULL_ROW = (1 << WIDTH) - 1
+
+# rows of each rock from the bottom up as bit masks, the leftmost column
+# being the highest bit, already two units away from the left wall
+ROCKS = (
+    (0b0011110,),
+    (0b0001000, 0b0011100, 0b0001000),
+    (0b0011100, 0b0000100, 0b0000100),
+    (0b0010000, 0b0010000, 0b0010000, 0b0010000),
+    (0b0011000, 0b0011000),
+)
 
 
 def parse(filename):
@@ -46,101 +33,90 @@ def parse(filename):
         yield from file_.read().rstrip()
 
 
-def rock_factory():
-    """Return a function to create falling rocks."""
-    symbols = cycle(SYMBOL_TO_SHAPE.keys())
+def drop_rocks(jet_patterns):
+    """Drop rocks forever and yield, after each rock comes to rest, the
+    height of the tower and a key of the state of the chamber.
+
+    The chamber is a window of row masks. Rows below the highest row
+    that falling rocks can no longer get past are discarded, so the key
+    made of the next rock, the next jet and the rows in the window fully
+    determines how the tower grows from then on.
+    """
+    jets = [1 if jet == '>' else -1 for jet in jet_patterns]
+    rows = []
+    base = 0
+    jet = 0
+    for rock_index in count(1):
+        rock = ROCKS[(rock_index - 1) % len(ROCKS)]
+        y = len(rows) + 3
+        while True:
+            if jets[jet] > 0:
+                pushed = tuple(row >> 1 for row in rock)
+                blocked = any(row & 1 for row in rock)
+            else:
+                pushed = tuple(row << 1 for row in rock)
+                blocked = any(row >> (WIDTH - 1) for row in rock)
+            jet = (jet + 1) % len(jets)
+            if not blocked and not _collides(rows, pushed, y):
+                rock = pushed
+
+            if y == 0 or _collides(rows, rock, y - 1):
+                break
+            y -= 1
+
+        for k, row in enumerate(rock, start=y):
+            if k == len(rows):
+                rows.append(row)
+            else:
+                rows[k] |= row
+
+        if floor := _floor(rows):
+            base += floor
+            del rows[:floor]
 
-    def create_rock(height):
-        return SYMBOL_TO_SHAPE[next(symbols)](height)
+        yield base + len(rows), (rock_index % len(ROCKS), jet, bytes(rows))
+
+
+def _collides(rows, rock, y):
+    return any(
+        rows[k] & row
+        for k, row in enumerate(rock, start=y)
+        if k < len(rows)
+    )
 
-    return create_rock
 
+def _floor(rows):
+    # sweep the cells falling rocks can reach from the top down, and
+    # return the index of the first row none of them gets past
+    reach = FULL_ROW
+    for i in range(len(rows) - 1, -1, -1):
+        free = ~rows[i] & FULL_ROW
+        reach &= free
+        while (spread := (reach | reach << 1 | reach >> 1) & free) != reach:
+            reach = spread
+        if not reach:
+            return i
 
-def find_repetition(data):
-    """Return a tuple of indices of the first and second rows that are
-    the beginning of repetition.
+    return 0
+
+
+def find_cycle(jet_patterns):
+    """Return the tower heights after each number of rocks up to the
+    detection of the cycle, and the cycle.
     """
-    num_types = len(SYMBOL_TO_SHAPE)
-    num_rows = len(data)
-    top_row = [h - data[-1][0] for h in data[-1]]
-
-    for j in range(num_rows - num_types - 1, num_rows // 2, -num_types):
-        i = 2 * j - num_rows + 1
-        middle_row = [h - data[j][0] for h in data[j]]
-        bottom_row = [h - data[i][0] for h in data[i]]
-
-        if top_row != middle_row or top_row != bottom_row:
-            continue
-
-        rep1 = (
-            [b - a for a, b in zip(data[i], item)]
-            for item in data[i + 1: j]
-        )
-
-        rep2 = (
-            [b - a for a, b in zip(data[j], item)]
-            for item in data[j + 1: num_rows - 1]
-        )
-
-        if all(r1 == r2 for r1, r2 in zip(rep1, rep2)):
-            return i, j
-
-    return None
-
-
-def calculate_height(first, second, heights, remaining_rocks):
-    """Calculate the tower height using repetition data."""
-    repeat_height = max(heights[second]) - max(heights[first])
-    divisor = second - first
-    num_rocks = remaining_rocks + 1
-    return (
-        (num_rocks // divisor + 2) * repeat_height
-        + max(heights[first + num_rocks % divisor - 1])
+    states = chain([(0, None)], drop_rocks(jet_patterns))
+    cycle, heights = cycles.find_cycle(
+        states, key=itemgetter(1), value=itemgetter(0),
     )
+    return heights, cycle
 
 
 def simulate(jet_patterns, num_rocks):
     """Simulate falling rocks and return the height after `num_rocks`
     rocks have stopped falling.
     """
-    moves = {
-        '>': lambda rock: tuple((i + 1, j) for i, j in rock),
-        '<': lambda rock: tuple((i - 1, j) for i, j in rock),
-        'V': lambda rock: tuple((i, j - 1) for i, j in rock),
-    }
-    width = 7
-    heights = [0] * width
-    chamber = set((i, 0) for i in range(1, 8))
-    create_rock = rock_factory()
-    jet_patterns = cycle(jet_patterns)
-    history = []
-
-    while num_rocks:
-        history.append(tuple(heights))
-        if repetition := find_repetition(history):
-            return calculate_height(*repetition, history, num_rocks)
-
-        rock = create_rock(max(heights))
-
-        for jet_pattern in jet_patterns:
-            moved_rock = moves[jet_pattern](rock)
-            if (not (set(moved_rock) & chamber)
-                    and moved_rock[0][0] > 0
-                    and moved_rock[-1][0] <= width):
-                rock = moved_rock
-
-            moved_rock = moves['V'](rock)
-            if (not (set(moved_rock) & chamber)
-                    and min(j for _, j in moved_rock) > 0):
-                rock = moved_rock
-            else:
-                chamber.update(rock)
-                num_rocks -= 1
-                for i, j in rock:
-                    heights[i - 1] = max(heights[i - 1], j)
-                break
-
-    return max(heights)
+    heights, cycle = find_cycle(jet_patterns)
+    return cycles.value_at(heights, cycle, num_rocks, additive=True)
 
 
 def main():
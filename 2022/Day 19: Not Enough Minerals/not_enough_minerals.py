@@ -2,11 +2,10 @@
 
 
 import re
-from contextlib import suppress
 from collections import defaultdict, namedtuple
-from functools import cache
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from math import prod
-from operator import attrgetter
 
 
 def parse(filename):
@@ -31,10 +30,6 @@ def _parse_blueprint(matches):
     return blueprint
 
 
-class NotEnoughMinerals(Exception):
-    """Raise when not enough minerals to build a robot."""
-
-
 class RobotFactory:
     """An object represents robot factory."""
 
@@ -50,102 +45,95 @@ class RobotFactory:
 
         return Resources()._replace(**max_costs)
 
-    def build(self, robot, resources):
-        """Build the specified robot and return the remaining
-        resources.
-        """
-        remainings = {}
-        for resource, cost in self.blueprint[robot].items():
-            if (remaining := getattr(resources, resource) - cost) < 0:
-                raise NotEnoughMinerals(resource)
-
-            remainings[resource] = remaining
-
-        return resources._replace(**remainings)
-
-
-class Robots(namedtuple('Robots', 'ore, clay, obsidian, geode',
-                        defaults=[1, 0, 0, 0])):
-    """An object reprents number of robots per resource type."""
-
-    def add(self, robot):
-        """Increase number of `robot` by 1."""
-        return self._replace(**{robot: getattr(self, robot) + 1})
-
-    def collect(self):
-        """Return resources collected by each robot type."""
-        return Resources._make(robot * 1 for robot in self)
-
 
 class Resources(namedtuple('Resources', 'ore, clay, obsidian, geode',
                            defaults=[0, 0, 0, 0])):
     """An object reprents number of resources per type."""
 
-    def __add__(self, other):
-        return Resources._make(a + b for a, b in zip(self, other))
-
-
-def run(blueprint, minutes):
-    """Run the blueprint for the given minutes."""
-    @cache
-    def _run(robots, resources, minutes):
-        if not minutes:
-            return resources
 
-        collected = robots.collect()
-
-        # greedy algorithm: always build geode-cracking robot and
-        # obsidian-collecting robot when there are enough resources
-        for robot in 'geode', 'obsidian':
-            try:
-                remaining = robot_factory.build(robot, resources)
-            except NotEnoughMinerals:
-                pass
+def max_geodes(blueprint, minutes):
+    """Return the largest number of geodes that could be opened, using a
+    depth-first search over which robot to build next that skips ahead
+    to the minute it gets built.
+    """
+    def _search(minutes, robots, resources, geodes):
+        nonlocal most
+        most = max(most, geodes)
+        if _bound(minutes, robots[2], resources[2], geodes) <= most:
+            return
+
+        for robot in range(3, -1, -1):
+            if robot < 3 and robots[robot] >= max_costs[robot]:
+                continue
+
+            wait = 0
+            for cost, amount, rate in zip(costs[robot], resources, robots):
+                if cost <= amount:
+                    continue
+                if not rate:
+                    break
+                wait = max(wait, -(-(cost - amount) // rate))
             else:
-                return _run(
-                    robots.add(robot),
-                    remaining + collected,
-                    minutes - 1,
-                )
-
-        posibilities = []
-        for robot in 'clay', 'ore':
-            with suppress(NotEnoughMinerals):
-                remaining = robot_factory.build(robot, resources)
-                posibilities.append(_run(
-                    robots.add(robot),
-                    remaining + collected,
-                    minutes - 1,
-                ))
-
-        if resources.ore < max_costs.ore:
-            posibilities.append(_run(
-                robots,
-                resources + collected,
-                minutes - 1,
-            ))
+                if (remaining := minutes - wait - 1) <= 0:
+                    continue
 
-        return max(posibilities, key=attrgetter('geode'))
-
-    robot_factory = RobotFactory(blueprint)
-    max_costs = robot_factory.get_max_costs()
-    return _run(Robots(), Resources(), minutes)
-
-
-def get_quality_levels(blueprints, minutes):
-    """Return an iterable of the quality levels of blueprints."""
-    result = (run(blueprint, minutes=minutes) for blueprint in blueprints)
-    for id_, resources in enumerate(result, start=1):
-        yield id_ * resources.geode
+                collected = tuple(
+                    amount + rate * (wait + 1) - cost
+                    for cost, amount, rate
+                    in zip(costs[robot], resources, robots)
+                )
+                if robot == 3:
+                    # count the geodes the robot will crack right away
+                    _search(remaining, robots, collected, geodes + remaining)
+                else:
+                    _search(
+                        remaining,
+                        robots[:robot] + (robots[robot] + 1,)
+                        + robots[robot + 1:],
+                        collected,
+                        geodes,
+                    )
+
+    def _bound(minutes, robots, obsidian, geodes):
+        # optimistic: ore and clay are free and an obsidian robot is
+        # built every minute alongside any affordable geode robot
+        for remaining in range(minutes - 1, -1, -1):
+            if obsidian >= costs[3][2]:
+                obsidian -= costs[3][2]
+                geodes += remaining
+
+            obsidian += robots
+            robots += 1
+
+        return geodes
+
+    resources = Resources._fields[:3]
+    costs = [
+        tuple(blueprint[robot].get(resource, 0) for resource in resources)
+        for robot in Resources._fields
+    ]
+    max_costs = RobotFactory(blueprint).get_max_costs()[:3]
+    most = 0
+    _search(minutes, (1, 0, 0), (0, 0, 0), 0)
+    return most
+
+
+def get_quality_levels(blueprints, minutes, workers=None):
+    """Return an iterable of the quality levels of blueprints, solving
+    the blueprints in parallel processes.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        result = executor.map(max_geodes, blueprints, repeat(minutes))
+        for id_, geodes in enumerate(result, start=1):
+            yield id_ * geodes
 
 
-def find_largest_geodes(blueprints, minutes):
+def find_largest_geodes(blueprints, minutes, workers=None):
     """Return an interable of the largest number of geodes that could be
-    open.
+    open, solving the blueprints in parallel processes.
     """
-    for blueprint in blueprints:
-        resources = run(blueprint, minutes=minutes)
-        yield resources.geode
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(max_geodes, blueprints, repeat(minutes))
 
 
 def main():
@@ -1,8 +1,7 @@
 """Day 20: Grove Positioning System"""
 
 
-from collections import deque
-from dataclasses import dataclass
+import math
 
 
 def parse(filename):
@@ -11,15 +10,64 @@ def parse(filename):
         return tuple(int(number) for number in file_.readlines())
 
 
-@dataclass
-class Number:
-    """A special type of number used in mixing process."""
-
-    number: int
-    index: int
-
-    def __int__(self):
-        return self.number
+class BlockList:
+    """A list of the items 0 to size - 1 split into blocks of about
+    the square root of its size, so finding where an item is and moving
+    it walks the blocks and a single block instead of the whole list.
+    """
+
+    def __init__(self, size, block_size=None):
+        self.block_size = block_size or max(1, math.isqrt(size))
+        self.blocks = [
+            list(range(start, min(start + self.block_size, size)))
+            for start in range(0, size, self.block_size)
+        ]
+        self.owners = [
+            block for block in self.blocks for _ in range(len(block))
+        ]
+
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block
+
+    def index(self, item):
+        """Return the position of the item."""
+        owner = self.owners[item]
+        position = 0
+        for block in self.blocks:
+            if block is owner:
+                return position + block.index(item)
+            position += len(block)
+
+        raise ValueError(f'{item} is not in the list')
+
+    def pop(self, item):
+        """Remove the item and return its position."""
+        position = self.index(item)
+        owner = self.owners[item]
+        owner.remove(item)
+        if not owner:
+            self.blocks.remove(owner)
+        return position
+
+    def insert(self, position, item):
+        """Insert the item at the position."""
+        for i, block in enumerate(self.blocks):
+            if position <= len(block):
+                break
+            position -= len(block)
+        else:
+            i, block = len(self.blocks), []
+            self.blocks.append(block)
+
+        block.insert(position, item)
+        self.owners[item] = block
+        if len(block) > 2 * self.block_size:
+            half = block[self.block_size:]
+            del block[self.block_size:]
+            self.blocks.insert(i + 1, half)
+            for moved in half:
+                self.owners[moved] = half
 
 
 def decrypt(numbers, key=1, rounds=1):
@@ -35,28 +83,15 @@ def decrypt(numbers, key=1, rounds=1):
 def mix(numbers, key, rounds):
     """Mix the numbers."""
     divisor = len(numbers) - 1
-    numbers = deque(
-        Number(number * key, index)
-        for index, number in enumerate(numbers)
-    )
+    numbers = [number * key for number in numbers]
+    order = BlockList(len(numbers))
 
     for _ in range(rounds):
-        for index in range(len(numbers)):
-            if numbers[0].index != index:
-                _rotate(numbers, index)
-
-            number = numbers.popleft()
-            index = int(number) % divisor
-            numbers.insert(index, number)
-
-    return [int(n) for n in numbers]
-
+        for item, number in enumerate(numbers):
+            position = order.pop(item)
+            order.insert((position + number) % divisor, item)
 
-def _rotate(numbers, index):
-    for i, number in enumerate(numbers):
-        if number.index == index:
-            numbers.rotate(-i)
-            break
+    return [numbers[item] for item in order]
 
 
 def main():
@@ -3,7 +3,7 @@
 
 import math
 from collections import defaultdict
-from itertools import chain, cycle, islice
+from itertools import chain, count, cycle
 
 
 N, S, W, E = range(4)
@@ -105,11 +105,115 @@ def find_end_round(positions):
     return math.inf
 
 
+class Bitboard:
+    """Elf positions as the bits of a single integer, row by row with a
+    fixed row stride, so a round is a handful of shifts and masks over
+    the whole grove. Empty margins keep the shifts from wrapping around
+    rows, and the board is rebuilt with fresh margins when Elves get
+    close to an edge.
+    """
+
+    margin = 16
+
+    def __init__(self, positions):
+        positions = list(positions)
+        self.top = min(i for i, _ in positions) - self.margin
+        self.left = min(j for _, j in positions) - self.margin
+        bottom = max(i for i, _ in positions) + self.margin
+        right = max(j for _, j in positions) + self.margin
+        rows = bottom - self.top + 1
+        self.stride = right - self.left + 1
+        self.board = 0
+        for i, j in positions:
+            self.board |= 1 << ((i - self.top) * self.stride + j - self.left)
+
+        row = (1 << self.stride) - 1
+        columns = sum(0b11 << (k * self.stride) for k in range(rows))
+        self.edges = (
+            row * 0b11
+            | row << (rows - 2) * self.stride
+            | columns
+            | columns << (self.stride - 2)
+        )
+
+    def positions(self):
+        """Return the set of Elf positions."""
+        positions = set()
+        board = self.board
+        while board:
+            index = (board & -board).bit_length() - 1
+            board &= board - 1
+            i, j = divmod(index, self.stride)
+            positions.add((i + self.top, j + self.left))
+
+        return positions
+
+    def step(self, first_direction):
+        """Run a round considering the directions from the given one and
+        return True if any Elf moved.
+        """
+        board, stride = self.board, self.stride
+        # bit p of each mask is set when there is an Elf at that side
+        north, south = board << stride, board >> stride
+        west, east = board << 1, board >> 1
+        north_west, north_east = north << 1, north >> 1
+        south_west, south_east = south << 1, south >> 1
+        crowded = board & (
+            north | south | west | east
+            | north_west | north_east | south_west | south_east
+        )
+        blocked = {
+            N: north_west | north | north_east,
+            S: south_west | south | south_east,
+            W: north_west | west | south_west,
+            E: north_east | east | south_east,
+        }
+        proposals = {}
+        for k in range(4):
+            direction = (first_direction + k) % 4
+            proposals[direction] = crowded & ~blocked[direction]
+            crowded &= ~proposals[direction]
+
+        # only Elves proposing opposite moves can collide
+        to_north, to_south = proposals[N] >> stride, proposals[S] << stride
+        to_west, to_east = proposals[W] >> 1, proposals[E] << 1
+        north_south = to_north & to_south
+        west_east = to_west & to_east
+        moved = (
+            ((to_north | to_south) & ~north_south)
+            | ((to_west | to_east) & ~west_east)
+        )
+        leaving = proposals[N] | proposals[S] | proposals[W] | proposals[E]
+        self.board = (
+            board & ~leaving
+            | moved
+            | north_south << stride | north_south >> stride
+            | west_east << 1 | west_east >> 1
+        )
+        if self.board & self.edges:
+            self.__init__(self.positions())
+
+        return self.board != board
+
+
+def find_end_round_bitboard(positions):
+    """Return the number of the first round where no Elf moves, using
+    the bitboard.
+    """
+    bitboard = Bitboard(positions)
+    for round_ in count(1):
+        if not bitboard.step((round_ - 1) % 4):
+            return round_
+
+
 def main():
     """Main entry."""
     positions = parse('input')
-    assert count_empty_ground(next(islice(simulate(positions), 9, 10))) == 3990
-    assert find_end_round(positions) == 1057
+    bitboard = Bitboard(positions)
+    for round_ in range(10):
+        bitboard.step(round_ % 4)
+    assert count_empty_ground(bitboard.positions()) == 3990
+    assert find_end_round_bitboard(positions) == 1057
 
 
 if __name__ == '__main__':
@@ -1,8 +1,8 @@
 """Day 24: Blizzard Basin"""
 
 
-from collections import defaultdict, deque
-from functools import cache
+import math
+from collections import defaultdict
 
 
 def parse(filename):
@@ -35,86 +35,121 @@ def parse(filename):
     return begin, end, dimensions, blizzards
 
 
-@cache
-def next_state(height, width, up=(), down=(), left=(), right=()):
-    """Return the next state of the valley and the blizzards."""
-    return {
-        'up': frozenset(((i - 2) % (height - 2) + 1, j) for i, j in up),
-        'down': frozenset((i % (height - 2) + 1, j) for i, j in down),
-        'left': frozenset((i, (j - 2) % (width - 2) + 1) for i, j in left),
-        'right': frozenset((i, j % (width - 2) + 1) for i, j in right),
-    }
+def rotate(mask, shift, width):
+    """Rotate the bits of a mask of the width by shift bits towards the
+    higher bits.
+    """
+    shift %= width
+    return (mask << shift | mask >> width - shift) & ((1 << width) - 1)
+
 
+class Valley:
+    """The inner tiles of the valley and where the blizzards are.
 
-def find_path(begin, end, dimensions, blizzards):
-    """Return the shortest path to avoid the blizzards and reach the
-    goal.
+    A row of tiles is a bit mask with bit j set for the column j from
+    the left wall. The blizzards moving left or right repeat every
+    `width` minutes and those moving up or down every `height` minutes,
+    so the masks of the tiles they cover in each row are computed once
+    for every minute of their period.
     """
-    def canonical(node):
-        pos, state = node
-        return pos, tuple(state.items())
-
-    def iter_children(node):
-        pos, state = node
-        new_state = next_state(height, width, **state)
-        p_x, p_y = pos
-
-        for i, j in (-1, 0), (1, 0), (0, -1), (0, 1), (0, 0):
-            new_pos = n_x, n_y = p_x + i, p_y + j
-            if new_pos == end:
-                yield new_pos, new_state
-                break
-
-            if (new_pos != begin
-                    and (n_x <= 0 or n_x >= height - 1
-                         or n_y <= 0 or n_y >= width - 1)):
-                continue
-
-            if all(new_pos not in blizzards
-                   for blizzards in new_state.values()):
-                yield new_pos, new_state
-
-    def get_path(preds, end):
-        pos, blizzards = end
-        path = [(pos, dict(blizzards))]
-        pred = preds[end]
-        while pred:
-            pos, blizzards = pred
-            path.append((pos, dict(blizzards)))
-            pred = preds[pred]
-
-        return list(reversed(path))
-
-    def bfs(start):
-        queue = deque([start])
-        preds = {canonical(start): None}
-        while queue:
-            node = queue.popleft()
-            for child in iter_children(node):
-                if (candidate := canonical(child)) in preds:
-                    continue
-
-                preds[candidate] = canonical(node)
-                new_pos, _ = child
-                if new_pos == end:
-                    return get_path(preds, candidate)
-
-                queue.append(child)
-
-    height, width = dimensions
-    return bfs((begin, blizzards))
+
+    def __init__(self, begin, end, dimensions, blizzards):
+        height, width = dimensions
+        self.height = height - 2
+        self.width = width - 2
+        self.begin = begin[1] - 1
+        self.end = end[1] - 1
+
+        left = [0] * self.height
+        right = [0] * self.height
+        for i, j in blizzards.get('left', ()):
+            left[i - 1] |= 1 << j - 1
+        for i, j in blizzards.get('right', ()):
+            right[i - 1] |= 1 << j - 1
+
+        self.horizontal = [
+            [
+                rotate(left[i], -time, self.width)
+                | rotate(right[i], time, self.width)
+                for i in range(self.height)
+            ]
+            for time in range(self.width)
+        ]
+
+        self.vertical = []
+        for time in range(self.height):
+            rows = [0] * self.height
+            for i, j in blizzards.get('up', ()):
+                rows[(i - 1 - time) % self.height] |= 1 << j - 1
+            for i, j in blizzards.get('down', ()):
+                rows[(i - 1 + time) % self.height] |= 1 << j - 1
+            self.vertical.append(rows)
+
+    def cross(self, time=0, back=False):
+        """Return the minute of reaching the end of the valley, or the
+        beginning when going back, leaving at the given minute.
+
+        All the tiles the expedition can be on at a minute are kept as
+        row masks and spread to the next minute at once. The blizzards
+        repeat every lcm(width, height) minutes, so once a whole period
+        goes by without reaching a tile at a minute of the period it was
+        never reached at before, the end is out of reach and None is
+        returned.
+        """
+        entry, exit_ = 0, self.height - 1
+        entry_bit, exit_bit = 1 << self.begin, 1 << self.end
+        if back:
+            entry, exit_ = exit_, entry
+            entry_bit, exit_bit = exit_bit, entry_bit
+
+        full = (1 << self.width) - 1
+        period = math.lcm(self.width, self.height)
+        reached = [[0] * self.height for _ in range(period)]
+        idle = 0
+        rows = [0] * self.height
+        while not rows[exit_] & exit_bit:
+            if idle > period:
+                return None
+
+            time += 1
+            horizontal = self.horizontal[time % self.width]
+            vertical = self.vertical[time % self.height]
+            spread = [row | row << 1 | row >> 1 for row in rows]
+            for i in range(self.height - 1):
+                spread[i] |= rows[i + 1]
+                spread[i + 1] |= rows[i]
+            spread[entry] |= entry_bit
+            rows = [
+                row & full & ~(blocked_h | blocked_v)
+                for row, blocked_h, blocked_v in zip(
+                    spread, horizontal, vertical,
+                )
+            ]
+
+            seen = reached[time % period]
+            if any(row & ~old for row, old in zip(rows, seen)):
+                reached[time % period] = [
+                    row | old for row, old in zip(rows, seen)
+                ]
+                idle = 0
+            else:
+                idle += 1
+
+        return time + 1
 
 
 def main():
     """Main entry."""
-    begin, end, dimensions, blizzards = parse('input')
-    path = find_path(begin, end, dimensions, blizzards)
-    assert len(path) - 1 == 257
-
-    paths = [path]
-    paths.append(find_path(end, begin, dimensions, paths[-1][-1][-1]))
-    paths.append(find_path(begin, end, dimensions, paths[-1][-1][-1]))
-    assert sum(len(path) - 1 for path in paths) == 828
+    # a single column always filled with blizzards going up
+    blocked = Valley((0, 1), (3, 1), (4, 3), {'up': {(1, 1), (2, 1)}})
+    assert blocked.cross() is None
+
+    valley = Valley(*parse('input'))
+    time = valley.cross()
+    assert time == 257
+
+    time = valley.cross(valley.cross(time, back=True))
+    assert time == 828
 
 
 if __name__ == '__main__':
@@ -1,22 +1,22 @@
 """Day 14: Parabolic Reflector Dish"""
 
 
-from itertools import groupby
+import sys
+from collections import Counter
+from itertools import chain
+from pathlib import Path
 
+if __name__ == '__main__':
+    # run as a script, so make the shared aoc package importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from aoc.cycles import advance
+from aoc.grid import Grid
 
-DIRECTIONS = {
-    'N': (-1, 0),
-    'W': (0, -1),
-    'S': (1, 0),
-    'E': (0, 1),
-}
 
-SORT_KEYS = {
-    'N': lambda r: r[0],
-    'W': lambda r: r[1],
-    'S': lambda r: -r[0],
-    'E': lambda r: -r[1],
-}
+ROUND = ord('O')
+CUBE = ord('#')
+EMPTY = ord('.')
 
 
 def parse(filename):
@@ -27,29 +27,40 @@ def parse(filename):
 
 
 class ParabolicReflectorDish:
-    """Parabolic reflector dish."""
+    """Parabolic reflector dish.
+
+    The round rocks are kept as grid indices. For every direction the
+    cells between cube rocks are split into segments ordered from the
+    side the rocks roll to, so a tilt only counts the rocks in each
+    segment and puts them in its first cells.
+    """
 
     def __init__(self, dish):
-        self.rounds, self.cubes, self.size = self._parse_dish(dish)
+        self.grid = Grid(dish, sentinel=CUBE)
+        self.size = self.grid.height, self.grid.width
+        self.rounds = list(self.grid.find_all(ROUND))
+        for index in self.rounds:
+            self.grid[index] = EMPTY
+
+        stride = self.grid.stride
+        self.segments = {
+            direction: self._segments(offset)
+            for direction, offset in (
+                ('N', -stride), ('W', -1), ('S', stride), ('E', 1),
+            )
+        }
+        self._loads = [
+            self.size[0] - self.grid.position(index)[0]
+            for index in range(len(self.grid.cells))
+        ]
 
     def tilt(self, direction):
         """Tilt the dish in a given direction."""
-        new_rounds = set()
-        i, j = DIRECTIONS[direction]
-        key = SORT_KEYS[direction]
-        for _, row in groupby(sorted(self.rounds, key=key), key=key):
-            for x, y in row:
-                while True:
-                    point = x + i, y + j
-                    if (self._out_of_bounds(point)
-                            or point in self.cubes
-                            or point in new_rounds):
-                        new_rounds.add((x, y))
-                        break
-
-                    x, y = point
-
-        self.rounds = new_rounds
+        segment_of, segments = self.segments[direction]
+        counts = Counter(map(segment_of.__getitem__, self.rounds))
+        self.rounds = list(chain.from_iterable(
+            segments[segment][:count] for segment, count in counts.items()
+        ))
         return self
 
     def spin_cycle(self):
@@ -60,59 +71,42 @@ class ParabolicReflectorDish:
 
     def total_load(self):
         """Get the load on the north support beams."""
-        return sum(self.size[0] - x for x, _ in self.rounds)
+        return sum(map(self._loads.__getitem__, self.rounds))
 
-    def _out_of_bounds(self, point):
-        height, width = self.size
-        x, y = point
-        return x < 0 or x >= height or y < 0 or y >= width
+    def _segments(self, offset):
+        # a segment starts at every cell with a cube rock or the border
+        # next to it in the direction of the tilt
+        cells = self.grid.cells
+        segment_of = [None] * len(cells)
+        segments = []
+        for start in self.grid.indices():
+            if cells[start] == CUBE or cells[start + offset] != CUBE:
+                continue
 
-    @staticmethod
-    def _parse_dish(dish):
-        cubes = set()
-        rounds = set()
-        for i, row in enumerate(dish):
-            for j, char in enumerate(row):
-                if char == 'O':
-                    rounds.add((i, j))
-                elif char == '#':
-                    cubes.add((i, j))
+            segment = []
+            index = start
+            while cells[index] != CUBE:
+                segment_of[index] = len(segments)
+                segment.append(index)
+                index -= offset
+            segments.append(segment)
 
-        return rounds, cubes, (len(dish), len(dish[0]))
+        return segment_of, segments
 
 
 def total_load(dish, cycles):
     """Get the total load on the north support beams after running the
     spin cycle for a given number of cycles.
     """
-    results = []
-    for _ in range(cycles):
-        results.append(dish.spin_cycle().rounds)
-        if pairs := find_repeat(results):
-            i, j = pairs
-            index = (cycles - i - 1) % (j - i + 1) + i
-            dish.rounds = results[index]
-            return dish.total_load()
-
-    return dish.total_load()
-
-
-def find_repeat(results):
-    """Find the first repeated result."""
-    last = results[-1]
-    for i in range(len(results) - 2, len(results) // 2, -1):
-        if last == results[i]:
-            j = len(results) - 1
-            k = i
-            while results[j] == results[k]:
-                j -= 1
-                if j == i:
-                    return k, j
-                k -= 1
-
-            break
-
-    return None
+    def spin(rounds):
+        dish.rounds = list(rounds)
+        return tuple(sorted(dish.spin_cycle().rounds))
+
+    def load(rounds):
+        dish.rounds = list(rounds)
+        return dish.total_load()
+
+    return advance(spin, tuple(sorted(dish.rounds)), cycles, value=load)
 
 
 def main():
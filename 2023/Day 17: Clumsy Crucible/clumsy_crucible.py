@@ -178,12 +178,101 @@ def dijkstra(city_map, crucible_type):
     raise ValueError('No path found')
 
 
+def least_heat_loss(city_map, min_straight=1, max_straight=3, path=False):
+    """Return the least heat loss from the start to the end, and the
+    positions along the path if `path` is set, otherwise None.
+
+    A state is a flat cell index times two plus the axis of the last
+    move, and each state relaxes every allowed run of straight moves
+    along the other axis at once, so the number of blocks moved in a
+    row never needs to be tracked. As heat losses are 1 to 9, the
+    states are kept in a circular bucket queue instead of a heap.
+    """
+    grid = city_map.city_map
+    rows, cols = len(grid), len(grid[0])
+    heat = [loss for row in grid for loss in row]
+    end = rows * cols - 1
+    limit = 9 * max_straight + 1
+    distances = [-1] * (2 * rows * cols)
+    done = bytearray(2 * rows * cols)
+    predecessors = [-1] * (2 * rows * cols) if path else None
+    buckets = [[] for _ in range(limit)]
+    distances[0] = distances[1] = 0
+    buckets[0] = [0, 1]
+
+    heat_loss = 0
+    pending = 2
+    while pending:
+        bucket = buckets[heat_loss % limit]
+        while bucket:
+            state = bucket.pop()
+            pending -= 1
+            if done[state] or distances[state] != heat_loss:
+                continue
+
+            done[state] = 1
+            index, axis = divmod(state, 2)
+            if index == end:
+                return heat_loss, (
+                    _trace(predecessors, state, cols) if path else None
+                )
+
+            # axis 0 moved horizontally last, so move vertically now
+            row, col = divmod(index, cols)
+            if axis:
+                stride, before, after = 1, col, cols - 1 - col
+            else:
+                stride, before, after = cols, row, rows - 1 - row
+
+            for step, reach in (stride, after), (-stride, before):
+                loss = heat_loss
+                for k in range(1, min(max_straight, reach) + 1):
+                    loss += heat[index + k * step]
+                    if k < min_straight:
+                        continue
+
+                    next_state = 2 * (index + k * step) + 1 - axis
+                    if done[next_state] or 0 <= distances[next_state] <= loss:
+                        continue
+
+                    distances[next_state] = loss
+                    if path:
+                        predecessors[next_state] = state
+                    buckets[loss % limit].append(next_state)
+                    pending += 1
+
+        heat_loss += 1
+
+    raise ValueError('No path found')
+
+
+def _trace(predecessors, state, cols):
+    turns = []
+    while state != -1:
+        turns.append(state // 2)
+        state = predecessors[state]
+
+    turns.reverse()
+    positions = [divmod(turns[0], cols)]
+    for src, dst in zip(turns, turns[1:]):
+        step = 1 if dst // cols == src // cols else cols
+        if dst < src:
+            step = -step
+
+        positions.extend(
+            divmod(index, cols)
+            for index in range(src + step, dst + step, step)
+        )
+
+    return positions
+
+
 def main():
     """Main program."""
     city_map = CityMap(parse('input'))
-    _, heat_loss = find_path(city_map, Crucible)
+    heat_loss, _ = least_heat_loss(city_map)
     assert heat_loss == 755
-    _, heat_loss = find_path(city_map, UltraCrucible)
+    heat_loss, _ = least_heat_loss(city_map, min_straight=4, max_straight=10)
     assert heat_loss == 881
 
 
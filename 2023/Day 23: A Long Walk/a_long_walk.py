@@ -2,6 +2,7 @@
 
 
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from itertools import chain
 
 
@@ -107,43 +108,212 @@ def _dfs(map_, pos, visited, destinations):
             pos = next_pos
 
 
-def count_steps(map_, forbid=None, slopes=None):
-    """Count the number of steps in the longest hike."""
+def number_graph(graph, start, end):
+    """Renumber the nodes of the graph to integers, the start being 0
+    and the end being 1, and return it as adjacency lists. A node next
+    to the end only keeps its edge to the end, since leaving it any
+    other way would leave the end unreachable.
+    """
+    index = {start: 0, end: 1}
+    for node in graph:
+        index.setdefault(node, len(index))
+
+    adjacency = [[] for _ in index]
+    for node, edges in graph.items():
+        adjacency[index[node]] = [(index[dest], dist) for dest, dist in edges]
+
+    for edges in adjacency:
+        for dest, dist in edges:
+            if dest == 1:
+                edges[:] = [(dest, dist)]
+                break
+
+    return adjacency
+
+
+def orient_perimeter(adjacency):
+    """Make the edges along the perimeter of an undirected maze one-way,
+    pointing away from the start, and return the new adjacency lists.
+
+    The junctions with fewer than four neighbors are taken to be the
+    outer face of the planar maze: a cycle through the junctions next
+    to the start and to the end, split by them into two arcs. A path
+    going back along an arc closes a loop with the arc behind it that
+    the end lies outside of, so it could never reach the end. When the
+    junctions with fewer than four neighbors do not form such a cycle,
+    the graph is returned unchanged.
+    """
+    neighbors = [set() for _ in adjacency]
+    for node, edges in enumerate(adjacency):
+        for next_node, _ in edges:
+            neighbors[node].add(next_node)
+            neighbors[next_node].add(node)
+
+    perimeter = {
+        node for node in range(2, len(adjacency)) if len(neighbors[node]) < 4
+    }
+    first = next(iter(neighbors[0]), None)
+    last = next(iter(neighbors[1]), None)
+    ring = {node: neighbors[node] & perimeter for node in perimeter}
+    if (len(neighbors[0]) != 1 or len(neighbors[1]) != 1
+            or first == last or first not in ring or last not in ring
+            or any(len(nodes) != 2 for nodes in ring.values())):
+        return adjacency
+
+    backward = set()
+    walked = {first}
+    for node in ring[first]:
+        previous = first
+        while node != last:
+            if node in walked:
+                return adjacency
+            walked.add(node)
+            backward.add((node, previous))
+            (next_node,) = ring[node] - {previous}
+            previous, node = node, next_node
+        backward.add((node, previous))
+
+    if walked | {last} != perimeter:
+        return adjacency
+
+    return [
+        [
+            (next_node, dist)
+            for next_node, dist in edges
+            if (node, next_node) not in backward
+        ]
+        for node, edges in enumerate(adjacency)
+    ]
+
+
+def longest_path(adjacency, node=0, visited=0, dist=0, end=1):
+    """Return the length of the longest path from the node to the end
+    without visiting any node twice, or -1 if there is none. Visited
+    nodes are tracked as a bitmask, and a path is abandoned once it
+    cannot beat the longest one even by entering every unvisited node
+    through its longest edge.
+    """
+    longest_edges = [0] * len(adjacency)
+    for edges in adjacency:
+        for next_node, next_dist in edges:
+            longest_edges[next_node] = max(longest_edges[next_node], next_dist)
+
+    visited |= 1 << node
+    remaining = sum(
+        longest
+        for i, longest in enumerate(longest_edges)
+        if not visited >> i & 1
+    )
+
+    longest = -1
+    stack = [(node, visited, dist, remaining)]
+    while stack:
+        node, visited, dist, remaining = stack.pop()
+        if dist + remaining <= longest:
+            continue
+
+        for next_node, next_dist in adjacency[node]:
+            if next_node == end:
+                longest = max(longest, dist + next_dist)
+            elif not visited >> next_node & 1:
+                stack.append((
+                    next_node,
+                    visited | 1 << next_node,
+                    dist + next_dist,
+                    remaining - longest_edges[next_node],
+                ))
+
+    return longest
+
+
+def split_paths(adjacency, depth, end=1):
+    """Return the partial paths from the start after `depth` steps as
+    tuples of node, visited bitmask and distance, along with the length
+    of the longest path reaching the end in fewer steps.
+    """
+    longest = -1
+    paths = [(0, 1, 0)]
+    for _ in range(depth):
+        next_paths = []
+        for node, visited, dist in paths:
+            for next_node, next_dist in adjacency[node]:
+                if next_node == end:
+                    longest = max(longest, dist + next_dist)
+                elif not visited >> next_node & 1:
+                    next_paths.append((
+                        next_node,
+                        visited | 1 << next_node,
+                        dist + next_dist,
+                    ))
+        paths = next_paths
+
+    return paths, longest
+
+
+def count_steps(map_, forbid=None, slopes=None, workers=1, depth=4,
+                grid_layout=False):
+    """Count the number of steps in the longest hike. With more than one
+    worker, the partial paths after the first `depth` steps are
+    searched in parallel processes. With `grid_layout`, the junctions
+    are expected to be laid out on a grid, and the edges along its
+    perimeter are made one-way by orient_perimeter.
+    """
     start = get_starting_position(map_)
     end = get_ending_position(map_)
     intersections = set(chain((start, end), iter_intersections(map_)))
     graph = build_graph(map_, intersections, forbid, slopes)
+    adjacency = number_graph(graph, start, end)
+    if grid_layout:
+        adjacency = orient_perimeter(adjacency)
 
-    longest = 0
-    queue = [(0, start, set())]
-    while queue:
-        dist, pos, visited = queue.pop()
-        if pos in visited:
-            continue
-
-        visited.add(pos)
-        for next_pos, next_dist in graph[pos]:
-            new_dist = dist + next_dist
-            if next_pos == end:
-                longest = max(longest, new_dist)
-            else:
-                queue.append((new_dist, next_pos, set(visited)))
+    if workers == 1:
+        return longest_path(adjacency)
 
-    return longest
+    paths, longest = split_paths(adjacency, depth)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(longest_path, adjacency, *path)
+            for path in paths
+        ]
+        return max(chain(
+            [longest],
+            (future.result() for future in futures),
+        ))
 
 
 def main():
     """Main program."""
+    map_ = list(parse('example'))
+    slopes = {'<': LEFT, '>': RIGHT, '^': UP, 'v': DOWN}
+    assert count_steps(
+        map_,
+        forbid={LEFT: '>', RIGHT: '<', UP: 'v', DOWN: '^'},
+        slopes=slopes,
+        workers=2,
+        depth=2,
+    ) == 94
+    assert count_steps(map_, forbid={}, slopes={}, workers=2, depth=2) == 154
+    assert count_steps(map_, forbid={}, slopes={}, grid_layout=True) == 154
+
+    # junctions not on a grid, with a triangle, are left as they are
+    adjacency = [
+        [(2, 1)], [], [(0, 1), (3, 10), (4, 1)], [(2, 10), (4, 1), (5, 1)],
+        [(2, 1), (3, 1), (5, 1)], [(3, 1), (4, 1), (1, 1)],
+    ]
+    assert orient_perimeter(adjacency) is adjacency
+    assert longest_path(adjacency) == 14
+
     map_ = list(parse('input'))
     assert count_steps(
         map_,
         forbid={LEFT: '>', RIGHT: '<', UP: 'v', DOWN: '^'},
-        slopes={'<': LEFT, '>': RIGHT, '^': UP, 'v': DOWN}
+        slopes=slopes,
     ) == 1998
     assert count_steps(
         map_,
         forbid={},
         slopes={},
+        grid_layout=True,
     ) == 6434
 
 
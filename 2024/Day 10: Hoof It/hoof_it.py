@@ -1,78 +1,75 @@
 """Day 10: Hoof It"""
 
 
-from itertools import product
+from aoc.grid import Grid
 
 
 def parse(filename):
-    """Parse the input file and return the topo map, start and end
-    points.
-    """
-    topo_map = []
-    starts = []
-    ends = []
-    with open(filename, 'r', encoding='utf-8') as f:
-        for i, line in enumerate(f):
-            topo_map.append([int(h) for h in line.strip()])
-            for j, h in enumerate(line):
-                if h == '0':
-                    starts.append((i, j))
-                elif h == '9':
-                    ends.append((i, j))
-
-    return topo_map, starts, ends
+    """Parse the input file and return the topo map as a grid."""
+    return Grid.from_file(filename)
 
 
-def score(topo_map, start, end, distinct=False):
-    """Return the score of a trailhead."""
-    count = 0
+def score(topo_map, start):
+    """Return the score of a trailhead, the number of distinct height 9
+    positions reachable from it.
+    """
+    cells = topo_map.cells
+    offsets = topo_map.offsets4
+    ends = set()
+    visited = {start}
     queue = [start]
     while queue:
-        x, y = queue.pop()
-        for m, n in (x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1):
-            if (
-                m < 0
-                or n < 0
-                or m >= len(topo_map)
-                or n >= len(topo_map[0])
-            ):
+        index = queue.pop()
+        height = cells[index]
+        for offset in offsets:
+            # the sentinel border is never one higher than a height
+            next_index = index + offset
+            if cells[next_index] - height != 1 or next_index in visited:
                 continue
 
-            if topo_map[m][n] - topo_map[x][y] != 1:
-                continue
+            visited.add(next_index)
+            if cells[next_index] == ord('9'):
+                ends.add(next_index)
+            else:
+                queue.append(next_index)
 
-            if (m, n) == end:
-                count += 1
-                if distinct:
-                    continue
-                return count
+    return len(ends)
 
-            queue.append((m, n))
 
-    return count
+def ratings(topo_map):
+    """Return a dict of trailhead/rating pairs, where the rating is the
+    number of distinct hiking trails that begin at the trailhead.
+    """
+    cells = topo_map.cells
+    offsets = topo_map.offsets4
+    trails = dict.fromkeys(topo_map.find_all('9'), 1)
+    for height in b'876543210':
+        trails = {
+            index: sum(
+                trails.get(index + offset, 0)
+                for offset in offsets
+            )
+            for index in topo_map.find_all(height)
+        }
+
+    return trails
 
 
 def test_example():
     """Test the example."""
-    topo_map, starts, ends = parse('example.txt')
+    topo_map = parse('example.txt')
     assert sum(
-        score(topo_map, start, end)
-        for start, end in product(starts, ends)
+        score(topo_map, start)
+        for start in topo_map.find_all('0')
     ) == 36
-    assert sum(
-        score(topo_map, start, end, distinct=True)
-        for start, end in product(starts, ends)
-    ) == 81
+    assert sum(ratings(topo_map).values()) == 81
 
 
 def test_puzzle():
     """Test the puzzle."""
-    topo_map, starts, ends = parse('input.txt')
+    topo_map = parse('input.txt')
     assert sum(
-        score(topo_map, start, end)
-        for start, end in product(starts, ends)
+        score(topo_map, start)
+        for start in topo_map.find_all('0')
     ) == 517
-    assert sum(
-        score(topo_map, start, end, distinct=True)
-        for start, end in product(starts, ends)
-    ) == 1116
+    assert sum(ratings(topo_map).values()) == 1116
@@ -1,108 +1,87 @@
 """Day 12: Garden Groups"""
 
 
-from collections import defaultdict
+from aoc.grid import Grid
 
 
 def parse(filename):
-    """Parse the garden map from a file."""
-    with open(filename, 'r', encoding='utf-8') as f:
-        for line in f:
-            yield line.strip()
+    """Parse the garden map from a file into a grid."""
+    return Grid.from_file(filename)
 
 
 def iter_regions(garden_map):
-    """Iterate over all regions in the garden map."""
+    """Iterate over all regions in the garden map as sets of indices."""
     visited = set()
 
-    for i in range(len(garden_map)):
-        for j in range(len(garden_map[0])):
-            if (i, j) in visited:
-                continue
-
-            yield (region := _get_region(garden_map, (i, j)))
-            visited.update(region)
-
+    for index in garden_map.indices():
+        if index in visited:
+            continue
 
-def neighbors(x, y):
-    """Iterate over the neighbors of a garden plot."""
-    for m, n in (x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1):
-        yield m, n
+        yield (region := _get_region(garden_map, index))
+        visited.update(region)
 
 
-def _get_region(garden_map, pos):
-    region = {pos}
-    queue = [pos]
+def _get_region(garden_map, index):
+    cells = garden_map.cells
+    plant = cells[index]
+    region = {index}
+    queue = [index]
     while queue:
-        x, y = queue.pop()
-        for m, n in _neighbor_plots(garden_map, x, y):
-            if (m, n) in region:
+        index = queue.pop()
+        for offset in garden_map.offsets4:
+            # the sentinel border never matches a plant
+            next_index = index + offset
+            if cells[next_index] != plant or next_index in region:
                 continue
 
-            region.add((m, n))
-            queue.append((m, n))
+            region.add(next_index)
+            queue.append(next_index)
 
     return region
 
 
-def _neighbor_plots(garden_map, x, y):
-    for m, n in neighbors(x, y):
-        if m < 0 or m >= len(garden_map) or n < 0 or n >= len(garden_map[0]):
-            continue
-
-        if garden_map[m][n] != garden_map[x][y]:
-            continue
-
-        yield m, n
-
-
 def area(region):
     """Return the area of a region."""
     return len(region)
 
 
-def perimeter1(region):
+def perimeter1(garden_map, region):
     """Return the perimeter of a region.
 
     The perimeter of a region is the number of sides of garden plots in
     the region that do not touch another garden plot in the same region.
     """
     return sum(
-        plot not in region
-        for x, y in region
-        for plot in neighbors(x, y)
+        index + offset not in region
+        for index in region
+        for offset in garden_map.offsets4
     )
 
 
-def perimeter2(region):
+def perimeter2(garden_map, region):
     """Return the perimeter of a region.
 
-    The perimeter of a region is the number of sides each region has.
+    The perimeter of a region is the number of sides each region has,
+    which is the same as the number of corners it has.
     """
-    perimeter = 0
-    direction_map = defaultdict(set)
-
-    for x, y in sorted(region):
-        for d, (m, n) in enumerate(sorted(neighbors(x, y))):
-            if (m, n) in region:
-                continue
-
-            directions = direction_map[d]
-            directions.add((m, n))
-
-            match d:
-                case 0 | 3 if (m, n - 1) not in directions:
-                    perimeter += 1
-                case 1 | 2 if (m - 1, n) not in directions:
-                    perimeter += 1
+    up, down, left, right = garden_map.offsets4
+    corners = 0
+    for index in region:
+        for a, b in (up, right), (right, down), (down, left), (left, up):
+            side_a = index + a in region
+            side_b = index + b in region
+            if not side_a and not side_b:
+                corners += 1
+            elif side_a and side_b and index + a + b not in region:
+                corners += 1
 
-    return perimeter
+    return corners
 
 
 def cost(garden_map, perimeter):
     """Return the cost of fence required to enclose all regions."""
     return sum(
-        area(region) * perimeter(region)
+        area(region) * perimeter(garden_map, region)
         for region in iter_regions(garden_map)
     )
 
@@ -115,7 +94,7 @@ def test_example():
         ('example5.txt', 1930),
     )
     for example, expected in test_inputs:
-        garden_map = list(parse(example))
+        garden_map = parse(example)
         assert cost(garden_map, perimeter1) == expected
 
     test_inputs = (
@@ -126,12 +105,12 @@ def test_example():
         ('example5.txt', 1206),
     )
     for example, expected in test_inputs:
-        garden_map = list(parse(example))
+        garden_map = parse(example)
         assert cost(garden_map, perimeter2) == expected
 
 
 def test_puzzle():
     """Test the puzzle."""
-    garden_map = list(parse('input.txt'))
+    garden_map = parse('input.txt')
     assert cost(garden_map, perimeter1) == 1449902
     assert cost(garden_map, perimeter2) == 908042
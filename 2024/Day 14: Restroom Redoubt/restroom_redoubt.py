@@ -5,7 +5,6 @@ import math
 import re
 from collections import Counter
 from dataclasses import dataclass
-from itertools import count
 from typing import List, NamedTuple, Tuple
 
 
@@ -36,8 +35,16 @@ class Space:
     tall: int
     robots: List[Robot]
 
+    @property
+    def period(self):
+        """Number of seconds after which every robot is back where it
+        started.
+        """
+        return math.lcm(self.wide, self.tall)
+
     def next(self, seconds=1):
         """Move all robots to new positions after number of seconds."""
+        seconds %= self.period
         self.robots = [
             r.move(self.wide, self.tall, seconds)
             for r in self.robots
@@ -119,9 +126,11 @@ def test_puzzle():
     assert math.prod(space.quadrants().values()) == 221616000
 
     space = Space(101, 103, robots)
-    for seconds in count(1):
+    for seconds in range(1, space.period + 1):
         space.next()
         if entropy(space.robots) < len(robots) // 2:
             space.draw()
             assert seconds == 7572
             break
+    else:
+        assert False, 'No tree within a period'
@@ -1,10 +1,17 @@
 """Day 16: Reindeer Maze"""
 
 
-import math
-from collections import defaultdict, deque
 from typing import NamedTuple
 
+from aoc.grid import Grid
+from aoc.search import UNREACHED, dijkstra, on_shortest_paths
+
+
+WALL = ord('#')
+
+# indices of the directions in Grid.offsets4
+DIRECTIONS = {(-1, 0): 0, (1, 0): 1, (0, -1): 2, (0, 1): 3}
+
 
 class Maze(NamedTuple):
     """The Reindeer Maze."""
@@ -14,34 +21,6 @@ class Maze(NamedTuple):
     end: tuple[int, int]
     direction: tuple[int, int]
 
-    def start_reindeer(self):
-        """Return the starting Reindeer."""
-        return Reindeer(self.start, self.direction, 0)
-
-
-class Reindeer(NamedTuple):
-    """The Reindeer in the maze."""
-
-    position: tuple[int, int]
-    direction: tuple[int, int]
-    score: int
-
-    def moves(self, maze_map):
-        """Return the possible moves for the Reindeer."""
-        for dx, dy in (0, 1), (1, 0), (0, -1), (-1, 0):
-            m, n = self.position[0] + dx, self.position[1] + dy
-            if maze_map[m][n] == '#':
-                continue
-
-            if self.direction[0] + dx == 0 and self.direction[1] + dy == 0:
-                continue
-
-            score = self.score + 1
-            if (dx, dy) != self.direction:
-                score += 1000
-
-            yield Reindeer((m, n), (dx, dy), score)
-
 
 def parse(filename):
     """Parse the input file and return a Maze object."""
@@ -64,60 +43,41 @@ def parse(filename):
 def solve(maze):
     """Solve the maze and return the lowest score and the number of
     tiles that are part of of at least one of the best paths.
+
+    A state is a tile and a direction numbered tile * 4 + direction.
+    Going on costs 1 and turning on the spot 1000, and the tiles on the
+    best paths are those of the states in the predecessor graph of the
+    best end states.
     """
-    reindeer = maze.start_reindeer()
-    queue = deque([(reindeer, {reindeer})])
-    visited = defaultdict(lambda: math.inf)
-    joints = {}
-    min_score = math.inf
-    min_paths = []
-
-    while queue:
-        reindeer, path = queue.popleft()
-        if reindeer.position == maze.end:
-            if reindeer.score < min_score:
-                min_score = reindeer.score
-                min_paths = [path]
-            elif reindeer.score == min_score:
-                min_paths.append(path)
-            continue
-
-        if reindeer.score > min_score:
-            continue
-
-        visit_score = visited[reindeer.position, reindeer.direction]
-        if reindeer.score > visit_score:
-            continue
-
-        if reindeer.score == visit_score:
-            joints[reindeer] = path
-            continue
-
-        visited[reindeer.position, reindeer.direction] = reindeer.score
-
-        for _reindeer in reindeer.moves(maze.map):
-            queue.append((_reindeer, path | {_reindeer}))
-
-    tiles = {
-        tile
-        for path in min_paths
-        for tile in _merge_paths(path, joints)
+    grid = Grid(maze.map, sentinel=WALL)
+    offsets = grid.offsets4
+
+    def _neighbors(state):
+        index, direction = divmod(state, 4)
+        ahead = index + offsets[direction]
+        if grid[ahead] != WALL:
+            yield ahead * 4 + direction, 1
+        yield state ^ 2, 1000
+        yield state ^ 3, 1000
+
+    end = grid.index(*maze.end)
+    result = dijkstra(
+        _neighbors,
+        [grid.index(*maze.start) * 4 + DIRECTIONS[maze.direction]],
+        len(grid.cells) * 4,
+        parents=True,
+    )
+    scores = {
+        state: result.distances[state]
+        for state in range(end * 4, end * 4 + 4)
+        if result.distances[state] != UNREACHED
     }
-    return min_score, len(tiles)
-
-
-def _merge_paths(path, joints):
-    result = {r.position for r in path}
-    queue = [path]
-
-    while queue:
-        path = queue.pop()
-        for reindeer in path:
-            if _reindeer := joints.pop(reindeer, None):
-                queue.append(_reindeer)
-                result.update(r.position for r in _reindeer)
-
-    return result
+    min_score = min(scores.values())
+    states = on_shortest_paths(
+        result.parents,
+        [state for state, score in scores.items() if score == min_score],
+    )
+    return min_score, len({state // 4 for state in states})
 
 
 def test_example():
@@ -1,7 +1,8 @@
 """Day 18: RAM Run"""
 
 
-from collections import deque
+from aoc.grid import Grid
+from aoc.search import bfs
 
 
 def parse(filename):
@@ -16,31 +17,24 @@ def simulate(byte_positions, end):
     """Simulate the falling bytes onto the memory space and return the
     minimum number of steps needed to reach the exit.
     """
-    bytes_ = set(byte_positions)
-    queue = deque([((0, 0), 0)])
-    visited = set()
-
-    while queue:
-        pos, steps = queue.popleft()
-        if pos == end:
-            return steps
-
-        if pos in visited:
-            continue
-
-        visited.add(pos)
-
-        x, y = pos
-        for m, n in (x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1):
-            if m < 0 or n < 0 or m > end[0] or n > end[1]:
-                continue
-
-            if (m, n) in bytes_:
-                continue
-
-            queue.append(((m, n), steps + 1))
-
-    return None
+    memory = Grid(['.' * (end[1] + 1)] * (end[0] + 1))
+    cells = memory.cells
+    for x, y in byte_positions:
+        cells[memory.index(x, y)] = ord('#')
+
+    def _neighbors(index):
+        for offset in memory.offsets4:
+            if cells[index + offset] == ord('.'):
+                yield index + offset
+
+    exit_ = memory.index(*end)
+    result = bfs(
+        _neighbors,
+        [memory.index(0, 0)],
+        len(cells),
+        is_target=exit_.__eq__,
+    )
+    return None if result.target is None else result.distances[exit_]
 
 
 def search_byte(bytes_, end):
@@ -62,11 +56,130 @@ def search_byte(bytes_, end):
     return bytes_[mid]
 
 
+class DisjointSet:
+    """Disjoint sets of the integers from 0 up to a size."""
+
+    def __init__(self, size):
+        self.parents = list(range(size))
+        self.sizes = [1] * size
+
+    def find(self, item):
+        """Return the representative of the set of the item."""
+        parents = self.parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    def union(self, first, second):
+        """Merge the sets of the two items."""
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return
+
+        if self.sizes[first] < self.sizes[second]:
+            first, second = second, first
+        self.parents[second] = first
+        self.sizes[first] += self.sizes[second]
+
+    def connected(self, first, second):
+        """Return whether the two items are in the same set."""
+        return self.find(first) == self.find(second)
+
+
+def find_blocking_byte(bytes_, end):
+    """Return the first byte blocking the exit.
+
+    All bytes fall first, then they are lifted again from the last one,
+    joining every freed cell with the free cells next to it, until the
+    start and the exit are joined.
+    """
+    memory = Grid(['.' * (end[1] + 1)] * (end[0] + 1))
+    cells = memory.cells
+    fallen = {}
+    for i, (x, y) in enumerate(bytes_):
+        index = memory.index(x, y)
+        fallen.setdefault(index, i)
+        cells[index] = ord('#')
+
+    free = DisjointSet(len(cells))
+
+    def _lift(index):
+        cells[index] = ord('.')
+        for offset in memory.offsets4:
+            if cells[index + offset] == ord('.'):
+                free.union(index, index + offset)
+
+    for index in memory.find_all('.'):
+        _lift(index)
+
+    start, exit_ = memory.index(0, 0), memory.index(*end)
+    if not free.connected(start, exit_):
+        for i in range(len(bytes_) - 1, -1, -1):
+            index = memory.index(*bytes_[i])
+            if fallen[index] != i:
+                continue
+
+            _lift(index)
+            if free.connected(start, exit_):
+                return bytes_[i]
+
+    return None
+
+
+class MemorySpace:
+    """The memory space with bytes falling one at a time.
+
+    The exit is cut off exactly when the corrupted cells, touching each
+    other by a side or a corner, connect the top or right edge to the
+    bottom or left edge. The corrupted cells are kept as disjoint sets
+    with one extra item for each of these two boundaries, so every byte
+    only joins the sets around it.
+    """
+
+    def __init__(self, end):
+        self.memory = Grid(['.' * (end[1] + 1)] * (end[0] + 1))
+        self.end = end
+        self._sets = DisjointSet(len(self.memory.cells) + 2)
+        self._upper_right = len(self.memory.cells)
+        self._lower_left = self._upper_right + 1
+
+    @property
+    def reachable(self):
+        """Whether the exit can still be reached from the start."""
+        return not self._sets.connected(self._upper_right, self._lower_left)
+
+    def drop(self, byte):
+        """Let the byte fall and return whether the exit can still be
+        reached.
+        """
+        x, y = byte
+        index = self.memory.index(x, y)
+        cells = self.memory.cells
+        cells[index] = ord('#')
+        for offset in self.memory.offsets8:
+            if cells[index + offset] == ord('#'):
+                self._sets.union(index, index + offset)
+
+        if x == 0 or y == self.end[1]:
+            self._sets.union(index, self._upper_right)
+        if y == 0 or x == self.end[0]:
+            self._sets.union(index, self._lower_left)
+
+        return self.reachable
+
+
 def test_example():
     """Test the example."""
     bytes_ = parse('example.txt')
     assert simulate(bytes_[:12], (6, 6)) == 22
     assert search_byte(bytes_, (6, 6)) == (6, 1)
+    assert find_blocking_byte(bytes_, (6, 6)) == (6, 1)
+
+    memory = MemorySpace((6, 6))
+    reachable = [memory.drop(byte) for byte in bytes_]
+    assert reachable.index(False) == bytes_.index((6, 1))
+    assert not any(reachable[bytes_.index((6, 1)):])
 
 
 def test_puzzle():
@@ -74,3 +187,10 @@ def test_puzzle():
     bytes_ = parse('input.txt')
     assert simulate(bytes_[:1024], (70, 70)) == 344
     assert search_byte(bytes_, (70, 70)) == (46, 18)
+    assert find_blocking_byte(bytes_, (70, 70)) == (46, 18)
+
+    memory = MemorySpace((70, 70))
+    for byte in bytes_:
+        if not memory.drop(byte):
+            break
+    assert byte == (46, 18)
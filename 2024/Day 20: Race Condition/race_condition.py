@@ -1,10 +1,18 @@
 """Day 20: Race Condition"""
 
 
-import math
-from collections import Counter, deque
+import sys
+from array import array
+from collections import Counter
 from typing import NamedTuple
 
+from aoc.grid import Grid
+from aoc.search import UNREACHED
+
+
+WALL = ord('#')
+MAX_CHEAT = 20
+
 
 class RaceTrack(NamedTuple):
     """A racetrack with start and end positions."""
@@ -45,71 +53,117 @@ def parse(filename):
     return RaceTrack(tuple(map_), start, end)
 
 
-def distances(racetrack, start=None, wall=True, max_dist=math.inf):
-    """Yield all positions and their distances from the start."""
-    queue = deque([(start or racetrack.start, 0)])
-    visited = set()
-
-    while queue:
-        pos, dist = queue.popleft()
-        if dist > max_dist:
-            continue
-
-        if pos in visited:
-            continue
-
-        visited.add(pos)
-        yield pos, dist
-
-        x, y = pos
-        for m, n in (x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1):
-            if (
-                m < 0
-                or n < 0
-                or m >= racetrack.height
-                or n >= racetrack.width
-            ):
-                continue
-
-            if wall and racetrack.map[m][n] == '#':
-                continue
+def race(racetrack):
+    """Return the grid of the racetrack, with a border as wide as the
+    longest cheat, the indices of the track from start to end, and the
+    distance from the start of every cell, UNREACHED for the walls.
+    """
+    grid = Grid(racetrack.map, border=MAX_CHEAT, sentinel=WALL)
+    dists = [UNREACHED] * len(grid.cells)
+    index = grid.index(*racetrack.start)
+    end = grid.index(*racetrack.end)
+    path = [index]
+    dists[index] = 0
+    while index != end:
+        for offset in grid.offsets4:
+            step = index + offset
+            if grid[step] != WALL and dists[step] == UNREACHED:
+                break
+        else:
+            raise ValueError('The racetrack is not a single track')
+
+        index = step
+        dists[index] = len(path)
+        path.append(index)
+
+    return grid, path, dists
+
+
+def diamond(radius, stride):
+    """Return the index offsets of the cells from two up to the radius
+    away, with their distances.
+    """
+    if radius > MAX_CHEAT:
+        raise ValueError(f'Cheats are at most {MAX_CHEAT} long')
+
+    return [
+        (i * stride + j, abs(i) + abs(j))
+        for i in range(-radius, radius + 1)
+        for j in range(abs(i) - radius, radius - abs(i) + 1)
+        if abs(i) + abs(j) >= 2
+    ]
 
-            queue.append(((m, n), dist + 1))
 
+def count_cheats(racetrack, max_dist, save=0):
+    """Count the number of possible cheats by the length of the race
+    with them.
+    """
+    grid, path, dists = race(racetrack)
+    normal_dist = len(path) - 1
+    offsets = diamond(max_dist, grid.stride)
+    counter = Counter()
+    for index in path:
+        base = dists[index]
+        counter.update(
+            normal_dist - saved
+            for saved in (
+                dists[index + offset] - dist - base
+                for offset, dist in offsets
+            )
+            if saved >= save
+        )
 
-def cheat_tracks(racetrack, max_dist):
-    """Yield all possible cheat tracks."""
-    for start, _ in distances(racetrack):
-        for end, dist in distances(
-                racetrack, start, wall=False, max_dist=max_dist):
-            if end == start:
-                continue
-
-            if racetrack.map[end[0]][end[1]] == '#':
-                continue
-
-            yield (start, end), dist
+    return counter
 
 
-def count_cheats(racetrack, max_dist, save=0):
-    """Count the number of possible cheats."""
-    dists = dict(distances(racetrack))
-    normal_dist = dists[racetrack.end]
-    cheats = {}
-
-    for cheat, cheat_dist in cheat_tracks(racetrack, max_dist):
-        dist = (
-            dists[cheat[0]]
-            + cheat_dist
-            + normal_dist
-            - dists[cheat[1]]
+def count_savings(racetrack, max_dist, save):
+    """Count the cheats saving at least `save` picoseconds."""
+    grid, path, dists = race(racetrack)
+    offsets = diamond(max_dist, grid.stride)
+    total = 0
+    for index in path:
+        least = dists[index] + save
+        total += sum(
+            dists[index + offset] - dist >= least for offset, dist in offsets
         )
-        if dist + save > normal_dist:
-            continue
-
-        cheats[cheat] = min(cheats.get(cheat, math.inf), dist)
 
-    return Counter(cheats.values())
+    return total
+
+
+def count_savings_lanes(racetrack, max_dist, save):
+    """Count the cheats saving at least `save` picoseconds, comparing
+    all cells at once for every offset.
+
+    Every cell gets a 16-bit lane of one big integer holding its
+    distance, zero for the walls. Adding the top bit of each lane to
+    the distances shifted by the offset and subtracting the distances,
+    the cheat and the saving leaves the top bit set exactly in the
+    lanes of the cheats saving enough, and no lane ever borrows.
+    """
+    grid, path, dists = race(racetrack)
+    if len(path) + max_dist + save >= 1 << 14:
+        raise ValueError('The racetrack is too long for 16-bit lanes')
+
+    values = int.from_bytes(
+        array('H', (max(dist, 0) for dist in dists)).tobytes(),
+        sys.byteorder,
+    )
+    track = int.from_bytes(
+        array('H', (0x8000 * (dist >= 0) for dist in dists)).tobytes(),
+        sys.byteorder,
+    )
+    ones = int.from_bytes(
+        array('H', [1] * len(dists)).tobytes(), sys.byteorder,
+    )
+    guard = ones << 15
+    total = 0
+    for offset, dist in diamond(max_dist, grid.stride):
+        shift = 16 * offset
+        ahead = values >> shift if shift >= 0 else values << -shift
+        gains = (guard | ahead) - values - (dist + save) * ones
+        total += (gains & track).bit_count()
+
+    return total
 
 
 def test_example():
@@ -117,10 +171,15 @@ def test_example():
     racetrack = parse('example.txt')
     counter = count_cheats(racetrack, 2, save=1)
     assert counter.total() == 44
+    assert counter[84 - 2] == 14
+    assert counter[84 - 64] == 1
 
     counter = count_cheats(racetrack, 20, save=50)
     assert counter.total() == 285
 
+    assert count_savings(racetrack, 2, save=1) == 44
+    assert count_savings_lanes(racetrack, 20, save=50) == 285
+
 
 def test_puzzle():
     """Test the puzzle."""
@@ -130,3 +189,6 @@ def test_puzzle():
 
     counter = count_cheats(racetrack, 20, save=100)
     assert counter.total() == 1017615
+
+    assert count_savings(racetrack, 2, save=100) == 1448
+    assert count_savings_lanes(racetrack, 20, save=100) == 1017615
@@ -1,8 +1,19 @@
 """Day 22: Monkey Market"""
 
 
+import os
+import sys
+from array import array
 from collections import Counter, deque
-from itertools import pairwise, islice
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait,
+)
+from itertools import pairwise, islice, repeat
+from operator import add, mod
+
+
+# number of distinct sequences of four price changes, each in -9..9
+SEQUENCES = 19 ** 4
 
 
 def parse(filename):
@@ -70,6 +81,168 @@ def count(secrets):
     return counter
 
 
+def pack(secrets):
+    """Pack the secret numbers into a single integer with one 32-bit lane
+    per buyer.
+    """
+    return int.from_bytes(array('I', secrets).tobytes(), sys.byteorder)
+
+
+def unpack(packed, size):
+    """Unpack the secret numbers of `size` buyers from the integer."""
+    secrets = array('I')
+    secrets.frombytes(packed.to_bytes(size * 4, sys.byteorder))
+    return secrets
+
+
+def generate_all(secrets):
+    """Produce the pseudorandom sequences of all buyers at once as
+    arrays of secret numbers. Every step applies the same shifts, xors
+    and masks to all buyers packed into a single integer, where masking
+    before shifting left keeps the bits from spilling into the next
+    lane, and pruning before shifting right keeps the bits above the
+    24 of a secret from shifting into them.
+    """
+    size = len(secrets)
+    mask24, mask18, mask13 = (
+        pack(repeat((1 << bits) - 1, size)) for bits in (24, 18, 13)
+    )
+    packed = pack(secrets)
+    yield unpack(packed, size)
+    while True:
+        packed ^= (packed & mask18) << 6
+        packed &= mask24
+        packed ^= packed >> 5
+        packed &= mask24
+        packed ^= (packed & mask13) << 11
+        yield unpack(packed, size)
+
+
+def iter_price_rows(secrets, n):
+    """Iterate over the first `n` prices of all buyers, one bytes object
+    of prices per step.
+    """
+    for batch in islice(generate_all(secrets), n):
+        yield bytes(map(mod, batch, repeat(10)))
+
+
+def encode(seq):
+    """Encode a sequence of four price changes into an index."""
+    index = 0
+    for change in seq:
+        index = index * 19 + change + 9
+
+    return index
+
+
+def decode(index):
+    """Decode the index into a sequence of four price changes."""
+    seq = []
+    for _ in range(4):
+        index, change = divmod(index, 19)
+        seq.append(change - 9)
+
+    return tuple(reversed(seq))
+
+
+def new_table():
+    """Return a zeroed dense array indexed by the encoded sequences."""
+    return array('q', bytes(8 * SEQUENCES))
+
+
+def accumulate(secrets, totals, stamps, generation=0, n=2000):
+    """Add the bananas of each buyer to the totals, only counting the
+    first occurrence of a sequence per buyer, and return the last
+    generation number stamped. Buyers are stamped with consecutive
+    generation numbers after `generation`, so the same stamps array can
+    be reused for any number of buyers.
+    """
+    rows = list(iter_price_rows(secrets, n + 1))
+    for generation, prices in enumerate(zip(*rows), start=generation + 1):
+        a, b, c, d = prices[:4]
+        index = (b - a + 9) * 361 + (c - b + 9) * 19 + d - c + 9
+        for prev, price in zip(prices[3:], prices[4:]):
+            index = index % 6859 * 19 + price - prev + 9
+            if stamps[index] != generation:
+                stamps[index] = generation
+                totals[index] += price
+
+    return generation
+
+
+def count_dense(secrets, n=2000):
+    """Return a dense array of bananas indexed by the encoded sequence
+    of four price changes.
+    """
+    totals = new_table()
+    accumulate(secrets, totals, new_table(), n=n)
+    return totals
+
+
+def iter_secrets(filename):
+    """Lazily iterate over the initial secret numbers in the file."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield int(line)
+
+
+def chunked(iterable, size):
+    """Collect data into lists of at most `size` items."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def count_stream(filename, chunk_size=1024, n=2000):
+    """Return a dense array of bananas by streaming the buyers from the
+    file in chunks, so memory does not grow with the number of buyers.
+    """
+    totals = new_table()
+    stamps = new_table()
+    generation = 0
+    for secrets in chunked(iter_secrets(filename), chunk_size):
+        generation = accumulate(secrets, totals, stamps, generation, n)
+
+    return totals
+
+
+def merge(totals, partial):
+    """Add the partial dense array of bananas into the totals."""
+    totals[:] = array('q', map(add, totals, partial))
+    return totals
+
+
+def count_parallel(filename, workers=None, chunk_size=1024, n=2000):
+    """Return a dense array of bananas by counting chunks of buyers in
+    worker processes and merging the partial results as they complete.
+    At most two chunks per worker are in flight at any time.
+    """
+    workers = workers or os.cpu_count()
+    totals = new_table()
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for secrets in chunked(iter_secrets(filename), chunk_size):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(totals, future.result())
+
+            pending.add(executor.submit(count_dense, secrets, n))
+
+        for future in as_completed(pending):
+            merge(totals, future.result())
+
+    return totals
+
+
+def most_bananas(totals):
+    """Return the best sequence of four price changes and the number of
+    bananas it gets.
+    """
+    index = max(range(SEQUENCES), key=totals.__getitem__)
+    return decode(index), totals[index]
+
+
 def test_example():
     """Test the example."""
     secrets = parse('example1.txt')
@@ -77,19 +250,27 @@ def test_example():
         next(islice(generate(secret), 2000, None))
         for secret in secrets
     ) == 37327623
+    assert sum(next(islice(generate_all(secrets), 2000, None))) == 37327623
+
+    secrets = [123, 2**24 + 5, 2**32 - 1, 77]
+    assert [
+        list(islice(generate(secret), 20)) for secret in secrets
+    ] == [list(column) for column in zip(*islice(generate_all(secrets), 20))]
 
     secrets = parse('example2.txt')
     counter = count(secrets)
     assert counter.most_common(1) == [((-2, 1, -1, 3), 23)]
+    assert most_bananas(count_dense(secrets)) == ((-2, 1, -1, 3), 23)
+    assert most_bananas(
+        count_stream('example2.txt', chunk_size=3)
+    ) == ((-2, 1, -1, 3), 23)
+    assert most_bananas(
+        count_parallel('example2.txt', workers=2, chunk_size=1)
+    ) == ((-2, 1, -1, 3), 23)
 
 
 def test_puzzle():
     """Test the puzzle."""
     secrets = parse('input.txt')
-    assert sum(
-        next(islice(generate(secret), 2000, None))
-        for secret in secrets
-    ) == 20506453102
-
-    counter = count(secrets)
-    assert counter.most_common(1) == [((0, 0, -1, 2), 2423)]
+    assert sum(next(islice(generate_all(secrets), 2000, None))) == 20506453102
+    assert most_bananas(count_stream('input.txt')) == ((0, 0, -1, 2), 2423)
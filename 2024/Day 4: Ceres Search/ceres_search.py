@@ -4,6 +4,8 @@
 from contextlib import suppress
 from functools import cache
 
+from aoc.grid import Grid
+
 
 def parse(filename):
     """Parse the word search from a file into a tuple of strings."""
@@ -72,15 +74,44 @@ def count_xmas2(i, j, word_search):
     return 0
 
 
+def count_xmas(grid):
+    """Count the number of XMAS words in all eight directions in the
+    grid, which needs a border of at least three cells.
+    """
+    cells = grid.cells
+    m, a, s = b'MAS'
+    return sum(
+        cells[i + d] == m and cells[i + 2 * d] == a and cells[i + 3 * d] == s
+        for i in grid.find_all('X')
+        for d in grid.offsets8
+    )
+
+
+def count_x_mas(grid):
+    """Count the number of MAS in the shape of an X in the grid."""
+    cells = grid.cells
+    up_left, _, up_right, _, down_right, _, down_left, _ = grid.offsets8
+    diagonals = {b'MS', b'SM'}
+    return sum(
+        bytes((cells[i + up_left], cells[i + down_right])) in diagonals
+        and bytes((cells[i + up_right], cells[i + down_left])) in diagonals
+        for i in grid.find_all('A')
+    )
+
+
 def test_example():
     """Test the example."""
     word_search = parse('example.txt')
     assert count(word_search, count_xmas1) == 18
     assert count(word_search, count_xmas2) == 9
 
+    grid = Grid.from_file('example.txt', border=3)
+    assert count_xmas(grid) == 18
+    assert count_x_mas(grid) == 9
+
 
 def test_puzzle():
     """Test the puzzle."""
-    word_search = parse('input.txt')
-    assert count(word_search, count_xmas1) == 2297
-    assert count(word_search, count_xmas2) == 1745
+    grid = Grid.from_file('input.txt', border=3)
+    assert count_xmas(grid) == 2297
+    assert count_x_mas(grid) == 1745
@@ -1,6 +1,8 @@
 """Day 6: Guard Gallivant"""
 
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import suppress
 
 
@@ -30,9 +32,10 @@ def parse(filename):
     return guard_map, start
 
 
-def trace(guard_map, start):
+def trace(guard_map, start, obstruction=None):
     """Return the positions visited by the guard starting at the given
-    position or return None if the guard gets stuck.
+    position or return None if the guard gets stuck. The optional
+    obstruction is treated as an obstacle without modifying the map.
     """
     i, j = start
     direction = DIRECTION_MAP[guard_map[i][j]]
@@ -43,7 +46,7 @@ def trace(guard_map, start):
         if out_of_bounds(guard_map, m, n):
             return positions
 
-        if guard_map[m][n] == '#':
+        if guard_map[m][n] == '#' or (m, n) == obstruction:
             direction = turn_right(direction)
         else:
             if ((m, n), direction) in positions:
@@ -71,6 +74,156 @@ def iter_maps(guard_map, positions):
         guard_map[x][y] = temp
 
 
+def build_jumps(guard_map):
+    """Return a dict of direction/table pairs. Each table maps every
+    position to the position where the guard walking in that direction
+    stops in front of the next obstacle, or to None if the guard walks
+    off the map.
+    """
+    rows, cols = len(guard_map), len(guard_map[0])
+    jumps = {}
+    for direction in DIRECTION_MAP.values():
+        dx, dy = direction
+        table = [[None] * cols for _ in range(rows)]
+        # sweep against the direction so the next cell is already done
+        for i in range(rows)[::-1 if dx > 0 else 1]:
+            for j in range(cols)[::-1 if dy > 0 else 1]:
+                m, n = i + dx, j + dy
+                if out_of_bounds(guard_map, m, n):
+                    continue
+
+                if guard_map[m][n] == '#':
+                    table[i][j] = (i, j)
+                else:
+                    table[i][j] = table[m][n]
+
+        jumps[direction] = table
+
+    return jumps
+
+
+def jump(jumps, pos, direction, obstruction=None):
+    """Return the position where the guard walking from the position in
+    the direction stops, taking the extra obstruction into account, or
+    None if the guard walks off the map.
+    """
+    (i, j), (dx, dy) = pos, direction
+    stop = jumps[direction][i][j]
+    if obstruction is None:
+        return stop
+
+    ox, oy = obstruction
+    if dx and oy == j and (ox - i) * dx > 0:
+        if stop is None or (stop[0] - ox) * dx >= 0:
+            return ox - dx, oy
+    elif dy and ox == i and (oy - j) * dy > 0:
+        if stop is None or (stop[1] - oy) * dy >= 0:
+            return ox, oy - dy
+
+    return stop
+
+
+def is_loop(jumps, pos, direction, obstruction=None):
+    """Return True if the guard starting at the position facing the
+    direction gets stuck in a loop, jumping from turn to turn.
+    """
+    turns = set()
+    while (pos := jump(jumps, pos, direction, obstruction)) is not None:
+        if (pos, direction) in turns:
+            return True
+
+        turns.add((pos, direction))
+        direction = turn_right(direction)
+
+    return False
+
+
+def iter_path(guard_map, start):
+    """Iterate over the positions and directions along the path of the
+    guard, step by step, until the guard walks off the map.
+    """
+    i, j = start
+    direction = DIRECTION_MAP[guard_map[i][j]]
+    yield start, direction
+
+    while True:
+        m, n = i + direction[0], j + direction[1]
+        if out_of_bounds(guard_map, m, n):
+            return
+
+        if guard_map[m][n] == '#':
+            direction = turn_right(direction)
+        else:
+            i, j = m, n
+
+        yield (i, j), direction
+
+
+def iter_candidates(guard_map, start, resume=True):
+    """Iterate over the positions where a single obstruction could be
+    placed along the path together with the position and direction the
+    guard is checked from. With `resume`, that is the state just before
+    the guard would first walk into the obstruction, otherwise the start.
+    """
+    i, j = start
+    initial = start, DIRECTION_MAP[guard_map[i][j]]
+    seen = {start}
+    previous = initial
+    for pos, direction in iter_path(guard_map, start):
+        if pos not in seen:
+            seen.add(pos)
+            yield pos, previous if resume else initial
+
+        previous = pos, direction
+
+
+def count_loops(guard_map, start, resume=True, jumps=None):
+    """Return the number of positions where a single obstruction makes
+    the guard get stuck in a loop.
+    """
+    jumps = jumps or build_jumps(guard_map)
+    return sum(
+        is_loop(jumps, pos, direction, obstruction)
+        for obstruction, (pos, direction)
+        in iter_candidates(guard_map, start, resume)
+    )
+
+
+_jumps = None
+
+
+def _init_worker(guard_map):
+    global _jumps  # pylint: disable=global-statement
+    _jumps = build_jumps(guard_map)
+
+
+def _count_chunk(candidates):
+    return sum(
+        is_loop(_jumps, pos, direction, obstruction)
+        for obstruction, (pos, direction) in candidates
+    )
+
+
+def count_loops_parallel(guard_map, start, resume=True, workers=None,
+                         chunks_per_worker=4):
+    """Return the number of positions where a single obstruction makes
+    the guard get stuck in a loop, evaluating chunks of the candidates
+    across worker processes that each build the jump table once.
+    """
+    workers = workers or os.cpu_count()
+    candidates = list(iter_candidates(guard_map, start, resume))
+    size = -(-len(candidates) // (workers * chunks_per_worker)) or 1
+    chunks = (
+        candidates[i:i + size]
+        for i in range(0, len(candidates), size)
+    )
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(guard_map,)) as executor:
+        return sum(executor.map(_count_chunk, chunks))
+
+
 def test_example():
     """Test the example."""
     guard_map, start = parse('example.txt')
@@ -80,6 +233,13 @@ def test_example():
         trace(m, start) is None
         for m in iter_maps(guard_map, positions - {start})
     ) == 6
+    assert count_loops(guard_map, start) == 6
+    assert count_loops(guard_map, start, resume=False) == 6
+    assert sum(
+        trace(guard_map, start, obstruction) is None
+        for obstruction in positions - {start}
+    ) == 6
+    assert count_loops_parallel(guard_map, start, workers=2) == 6
 
 
 def test_puzzle():
@@ -87,7 +247,5 @@ def test_puzzle():
     guard_map, start = parse('input.txt')
     positions = {pos for pos, _ in trace(guard_map, start)}
     assert len(positions) == 4967
-    assert sum(
-        trace(m, start) is None
-        for m in iter_maps(guard_map, positions - {start})
-    ) == 1789
+    assert count_loops(guard_map, start) == 1789
+    assert count_loops_parallel(guard_map, start) == 1789
@@ -0,0 +1,6 @@
+"""Shared tooling for running and benchmarking the puzzle solutions.
+
+Day modules importing from this package need the repository root on
+``sys.path``. pytest.ini and the runner take care of that, and the days
+with a ``main`` entry point add the root themselves when run as scripts.
+"""
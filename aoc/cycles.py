@@ -0,0 +1,195 @@
+"""Cycle detection and fast-forwarding for periodic simulations.
+
+A deterministic simulation whose state repeats is run only until the
+repetition shows up. From then on the value at any later step is read
+off the values recorded so far, where the value is whatever part of
+the state the answer needs, such as a load or a height.
+"""
+
+
+from itertools import count
+from typing import NamedTuple
+
+
+class Cycle(NamedTuple):
+    """The states from step `start` on repeat every `period` steps."""
+
+    start: int
+    period: int
+
+
+def iterate(step, state):
+    """Iterate over the state and the states following it."""
+    while True:
+        yield state
+        state = step(state)
+
+
+def find_cycle(states, key=None, value=None):
+    """Return the cycle of the states and the list of their values up to
+    and including the first repeated state.
+
+    Each state is fingerprinted with `key(state)`, which must be
+    hashable, and only the fingerprints and values are kept.
+    """
+    seen = {}
+    values = []
+    for n, state in enumerate(states):
+        fingerprint = key(state) if key else state
+        values.append(value(state) if value else state)
+        if fingerprint in seen:
+            return Cycle(seen[fingerprint], n - seen[fingerprint]), values
+
+        seen[fingerprint] = n
+
+    raise ValueError('The states do not repeat')
+
+
+def find_cycle_brent(step, state, key=None):
+    """Return the cycle of the states following the state using Brent's
+    algorithm, which keeps only two states at a time.
+    """
+    def _key(state):
+        return key(state) if key else state
+
+    power = period = 1
+    tortoise, hare = state, step(state)
+    while _key(tortoise) != _key(hare):
+        if power == period:
+            tortoise = hare
+            power *= 2
+            period = 0
+        hare = step(hare)
+        period += 1
+
+    tortoise = hare = state
+    for _ in range(period):
+        hare = step(hare)
+
+    for start in count():
+        if _key(tortoise) == _key(hare):
+            return Cycle(start, period)
+        tortoise, hare = step(tortoise), step(hare)
+
+    raise AssertionError('unreachable')
+
+
+def value_at(values, cycle, n, additive=False):
+    """Return the value at step n from the values recorded by
+    find_cycle. With `additive`, the values are numbers growing by the
+    same amount every period instead of repeating.
+    """
+    if n < len(values):
+        return values[n]
+
+    cycles, rest = divmod(n - cycle.start, cycle.period)
+    result = values[cycle.start + rest]
+    if additive:
+        end = cycle.start + cycle.period
+        result += cycles * (values[end] - values[cycle.start])
+
+    return result
+
+
+def advance(step, state, n, key=None, value=None, additive=False,
+            constant_memory=False):
+    """Return the value of the state after n steps, simulating only
+    until the state repeats.
+
+    With `constant_memory`, the cycle is found with Brent's algorithm
+    and the needed steps are simulated again instead of recording the
+    values, for periods too long to keep a value per step.
+    """
+    if not constant_memory:
+        cycle, values = find_cycle(iterate(step, state), key, value)
+        return value_at(values, cycle, n, additive)
+
+    cycle = find_cycle_brent(step, state, key)
+    wanted = {n}
+    if n >= cycle.start + cycle.period:
+        cycles, rest = divmod(n - cycle.start, cycle.period)
+        wanted = {cycle.start + rest}
+        if additive:
+            wanted |= {cycle.start, cycle.start + cycle.period}
+
+    found = {}
+    for i, current in enumerate(iterate(step, state)):
+        if i in wanted:
+            found[i] = value(current) if value else current
+        if len(found) == len(wanted):
+            break
+
+    if n in found:
+        return found[n]
+
+    result = found[cycle.start + rest]
+    if additive:
+        end = cycle.start + cycle.period
+        result += cycles * (found[end] - found[cycle.start])
+
+    return result
+
+
+def _simulate(step, state, n, value=None):
+    for _ in range(n):
+        state = step(state)
+    return value(state) if value else state
+
+
+def test_find_cycle():
+    """Test both detections on a sequence entering a cycle late."""
+    def step(x):
+        return (x * x + 1) % 255
+
+    cycle, values = find_cycle(iterate(step, 3))
+    assert cycle == Cycle(2, 6)
+    assert values == [3, 10, 101, 2, 5, 26, 167, 95, 101]
+    assert find_cycle_brent(step, 3) == cycle
+    assert find_cycle_brent(step, 101) == Cycle(0, 6)
+
+
+def test_advance():
+    """Test advancing before, inside and past the first period."""
+    def step(x):
+        return (x * x + 1) % 255
+
+    for n in [*range(20), 1000, 10**12]:
+        expected = _simulate(step, 3, n % 6 + 6 if n > 20 else n)
+        assert advance(step, 3, n) == expected
+        assert advance(step, 3, n, constant_memory=True) == expected
+
+
+def test_advance_additive():
+    """Test advancing values growing by the same amount every period,
+    with a fingerprint leaving the growing part out.
+    """
+    def step(state):
+        total, phase = state
+        next_phase = phase + 1 if phase < 0 else (phase + 1) % 5
+        return total + (7 if phase == 4 else 1), next_phase
+
+    def key(state):
+        return state[1]
+
+    def value(state):
+        return state[0]
+
+    for n in [*range(15), 12345, 10**12]:
+        expected = n // 5 * 11 + n % 5
+        for constant_memory in False, True:
+            assert advance(
+                step, (0, 0), n, key, value,
+                additive=True, constant_memory=constant_memory,
+            ) == expected
+
+    # two steps lead into the cycle
+    for n in [*range(20), 10**12]:
+        expected = (
+            _simulate(step, (0, -2), n, value) if n < 20
+            else 2 + (n - 2) // 5 * 11 + (n - 2) % 5
+        )
+        for constant_memory in False, True:
+            assert advance(
+                step, (0, -2), n, key, value,
+                additive=True, constant_memory=constant_memory,
+            ) == expected
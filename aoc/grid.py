@@ -0,0 +1,204 @@
+"""A flat, sentinel-bordered grid shared by the grid-based puzzles.
+
+The cells are stored row by row in a single ``bytearray`` and addressed
+by integer indices, so moving to a neighbor is adding an offset from a
+precomputed table. The grid is surrounded by a border of sentinel bytes
+wide enough that stepping off the edge lands on a sentinel rather than
+out of range, which takes the bounds checks out of the hot loops.
+"""
+
+
+import os
+import tempfile
+from functools import cached_property
+
+
+SENTINEL = 0
+
+
+class Grid:
+    """A rectangular grid of single-byte cells."""
+
+    def __init__(self, lines, border=1, sentinel=SENTINEL):
+        lines = [
+            line.encode() if isinstance(line, str) else bytes(line)
+            for line in lines
+        ]
+        if not lines or any(len(line) != len(lines[0]) for line in lines):
+            raise ValueError('Grid rows must be non-empty and equal length')
+
+        self.height = len(lines)
+        self.width = len(lines[0])
+        self.border = border
+        self.sentinel = sentinel
+        self.stride = self.width + 2 * border
+        pad = bytes([sentinel]) * border
+        self.cells = bytearray(bytes([sentinel]) * self.stride * border)
+        for line in lines:
+            self.cells += pad + line + pad
+        self.cells += bytes([sentinel]) * self.stride * border
+
+    @classmethod
+    def from_file(cls, filename, border=1, sentinel=SENTINEL):
+        """Read the grid from a file with one row per line."""
+        with open(filename, 'r', encoding='utf-8') as f:
+            return cls(
+                (line.rstrip('\n') for line in f if line.strip()),
+                border,
+                sentinel,
+            )
+
+    def __str__(self):
+        return '\n'.join(
+            self.cells[start:start + self.width].decode()
+            for start in self.row_starts
+        )
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __setitem__(self, index, value):
+        self.cells[index] = value
+
+    def __len__(self):
+        return self.height * self.width
+
+    def copy(self):
+        """Return a copy of the grid sharing no cells with it."""
+        grid = object.__new__(type(self))
+        grid.__dict__.update(self.__dict__)
+        grid.cells = bytearray(self.cells)
+        return grid
+
+    def index(self, row, col):
+        """Return the index of the cell at the row and column."""
+        return (row + self.border) * self.stride + col + self.border
+
+    def position(self, index):
+        """Return the row and column of the cell at the index."""
+        row, col = divmod(index, self.stride)
+        return row - self.border, col - self.border
+
+    @cached_property
+    def row_starts(self):
+        """The index of the first cell of every row."""
+        return range(
+            self.index(0, 0), self.index(self.height, 0), self.stride,
+        )
+
+    @cached_property
+    def offsets4(self):
+        """The index offsets of the up, down, left and right neighbors."""
+        return -self.stride, self.stride, -1, 1
+
+    @cached_property
+    def offsets8(self):
+        """The index offsets of the eight neighbors, clockwise from the
+        upper left one.
+        """
+        stride = self.stride
+        return (
+            -stride - 1, -stride, -stride + 1, 1,
+            stride + 1, stride, stride - 1, -1,
+        )
+
+    def indices(self):
+        """Iterate over the indices of all cells, row by row."""
+        for start in self.row_starts:
+            yield from range(start, start + self.width)
+
+    def find(self, value):
+        """Return the index of the first cell with the value."""
+        value = value if isinstance(value, int) else ord(value)
+        for index in self.find_all(value):
+            return index
+
+        raise ValueError(f'{chr(value)!r} is not in the grid')
+
+    def find_all(self, value):
+        """Iterate over the indices of the cells with the value."""
+        value = value if isinstance(value, int) else ord(value)
+        for start in self.row_starts:
+            end = start + self.width
+            index = self.cells.find(value, start, end)
+            while index != -1:
+                yield index
+                index = self.cells.find(value, index + 1, end)
+
+
+def test_index_position():
+    """Test that indices and positions round-trip on wide borders."""
+    for border in 1, 3:
+        grid = Grid(['abc', 'def'], border=border)
+        assert grid.stride == 3 + 2 * border
+        assert len(grid.cells) == grid.stride * (2 + 2 * border)
+        for row in range(-border, 2 + border):
+            for col in range(-border, 3 + border):
+                index = grid.index(row, col)
+                assert 0 <= index < len(grid.cells)
+                assert grid.position(index) == (row, col)
+
+        assert [grid.position(i) for i in grid.indices()] == [
+            (row, col) for row in range(2) for col in range(3)
+        ]
+        assert bytes(grid[i] for i in grid.indices()) == b'abcdef'
+        assert grid[grid.index(-border, -border)] == SENTINEL
+
+
+def test_neighbors():
+    """Test the neighbor offsets and the sentinel border."""
+    grid = Grid(['abc', 'def', 'ghi'], sentinel=ord('#'))
+    center = grid.index(1, 1)
+    assert bytes(grid[center + o] for o in grid.offsets4) == b'bhdf'
+    assert bytes(grid[center + o] for o in grid.offsets8) == b'abcfihgd'
+    corner = grid.index(0, 0)
+    assert bytes(grid[corner + o] for o in grid.offsets4) == b'#d#b'
+
+
+def test_find():
+    """Test finding cells by str or int value."""
+    grid = Grid(['a.b', '.a.'])
+    assert grid.find('a') == grid.index(0, 0)
+    assert grid.find(ord('b')) == grid.index(0, 2)
+    assert list(grid.find_all('a')) == [grid.index(0, 0), grid.index(1, 1)]
+    assert list(grid.find_all('z')) == []
+    try:
+        grid.find('z')
+    except ValueError:
+        pass
+    else:
+        assert False, 'find should raise on a missing value'
+
+
+def test_copy():
+    """Test that a copy shares no cells with the grid."""
+    grid = Grid(['ab', 'cd'])
+    copy = grid.copy()
+    copy[copy.index(0, 0)] = ord('z')
+    assert str(grid) == 'ab\ncd'
+    assert str(copy) == 'zb\ncd'
+    assert copy.offsets4 == grid.offsets4
+    assert len(copy) == len(grid) == 4
+
+
+def test_from_file():
+    """Test reading a grid, skipping blank lines."""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'grid')
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('\nab\n\ncd\n\n')
+        grid = Grid.from_file(filename, border=2)
+
+    assert (grid.height, grid.width, grid.border) == (2, 2, 2)
+    assert str(grid) == 'ab\ncd'
+
+
+def test_ragged():
+    """Test that rows of different lengths are rejected."""
+    for lines in [], ['ab', 'c']:
+        try:
+            Grid(lines)
+        except ValueError:
+            pass
+        else:
+            assert False, 'Grid should reject ragged or empty rows'
@@ -0,0 +1,320 @@
+"""Run the puzzle solutions and report wall time and memory usage.
+
+Every ``YYYY/Day N: Title/*.py`` module is discovered and each of its
+parts, the ``test_*`` functions or ``main``, is run in a fresh process
+with the module's directory as working directory so the relative input
+paths resolve the same way no matter where the runner is started.
+The parts are independent, so they can be fanned out over several
+worker processes, slowest first according to a previous report.
+
+    python -m aoc.runner 2024 "2022/Day 1?:*" --json report.json
+    python -m aoc.runner --jobs 16 --history report.json
+"""
+
+
+import argparse
+import ast
+import contextlib
+import csv
+import importlib
+import io
+import json
+import math
+import os
+import re
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from fnmatch import fnmatch
+from multiprocessing import get_context
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DAY_PATTERN = re.compile(r'Day (\d+): (.+)')
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+@dataclass(frozen=True)
+class Part:
+    """A runnable part of a puzzle solution."""
+
+    year: int
+    day: int
+    title: str
+    path: Path
+    name: str
+
+    def __str__(self):
+        return f'{self.year} Day {self.day:2d}: {self.title} [{self.name}]'
+
+    @property
+    def key(self):
+        """Return the key identifying the part across runs."""
+        return self.year, self.day, self.name
+
+
+@dataclass(frozen=True)
+class Result:
+    """The outcome and measurements of running a part."""
+
+    year: int
+    day: int
+    title: str
+    part: str
+    passed: bool
+    wall_time: float
+    peak_rss: int
+    tracemalloc_peak: int | None = None
+    error: str | None = None
+
+    @property
+    def key(self):
+        """Return the key identifying the part across runs."""
+        return self.year, self.day, self.part
+
+
+def discover(patterns=(), root=ROOT):
+    """Return the paths of the solution modules whose day directory,
+    relative to the root, matches any of the glob patterns.
+    """
+    paths = []
+    for path in root.glob('[0-9][0-9][0-9][0-9]/Day *: */*.py'):
+        day_dir = path.parent.relative_to(root).as_posix()
+        if not patterns or any(
+                fnmatch(day_dir, pattern) or fnmatch(day_dir, pattern + '*')
+                for pattern in patterns):
+            paths.append(path)
+
+    return sorted(paths, key=_sort_key)
+
+
+def _sort_key(path):
+    match = DAY_PATTERN.match(path.parent.name)
+    return int(path.parent.parent.name), int(match[1]), path.name
+
+
+def iter_parts(path):
+    """Iterate over the parts defined in the solution module without
+    importing it.
+    """
+    year = int(path.parent.parent.name)
+    match = DAY_PATTERN.match(path.parent.name)
+    tree = ast.parse(path.read_text(encoding='utf-8'))
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef) or node.args.args:
+            continue
+
+        if node.name == 'main' or node.name.startswith('test'):
+            yield Part(year, int(match[1]), match[2], path, node.name)
+
+
+def load_module(path):
+    """Import the solution module by its file name, the same way pytest
+    does, so that its functions can be pickled to worker processes.
+    The root is also put on the path for the shared ``aoc`` modules.
+    """
+    for directory in str(ROOT), str(path.parent):
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+
+    return importlib.import_module(path.stem)
+
+
+def run_part(part, trace_memory=False):
+    """Run the part in the current process and return its result."""
+    error = None
+    with contextlib.chdir(part.path.parent), \
+            contextlib.redirect_stdout(io.StringIO()):
+        func = getattr(load_module(part.path), part.name)
+        if trace_memory:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as exc:  # pylint: disable=broad-except
+            error = f'{type(exc).__name__}: {exc}'.rstrip(': ')
+
+        wall_time = time.perf_counter() - start
+
+    traced_peak = None
+    if trace_memory:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    # parts running their own process pools peak in their children
+    peak_rss = max(
+        resource.getrusage(who).ru_maxrss
+        for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+    ) * RSS_UNIT
+    return Result(
+        part.year, part.day, part.title, part.name,
+        passed=error is None,
+        wall_time=wall_time,
+        peak_rss=peak_rss,
+        tracemalloc_peak=traced_peak,
+        error=error,
+    )
+
+
+def run(parts, trace_memory=False, jobs=1):
+    """Run each part in its own fresh process, at most `jobs` at a time
+    in the given order, and yield the results as they complete.
+    """
+    with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=get_context('spawn'),
+            max_tasks_per_child=1) as executor:
+        futures = {
+            executor.submit(run_part, part, trace_memory): part
+            for part in parts
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                # the worker itself died, e.g. killed for running out
+                # of memory, so report the part as failed and go on
+                part = futures[future]
+                yield Result(
+                    part.year, part.day, part.title, part.name,
+                    passed=False,
+                    wall_time=0.0,
+                    peak_rss=0,
+                    error=f'{type(exc).__name__}: {exc}'.rstrip(': '),
+                )
+
+
+def load_timings(filename):
+    """Return a dict of part key/wall time pairs from a JSON report."""
+    with open(filename, 'r', encoding='utf-8') as file_:
+        return {
+            (item['year'], item['day'], item['part']): item['wall_time']
+            for item in json.load(file_)
+        }
+
+
+def schedule(parts, timings):
+    """Return the parts ordered longest first by their historical wall
+    time. The parts without history are assumed to be the slowest.
+    """
+    return sorted(parts, key=lambda part: -timings.get(part.key, math.inf))
+
+
+def write_json(results, filename):
+    """Write the results to a JSON file."""
+    with open(filename, 'w', encoding='utf-8') as file_:
+        json.dump([asdict(result) for result in results], file_, indent=2)
+
+
+def write_csv(results, filename):
+    """Write the results to a CSV file."""
+    with open(filename, 'w', encoding='utf-8', newline='') as file_:
+        writer = csv.DictWriter(file_, fieldnames=Result.__annotations__)
+        writer.writeheader()
+        writer.writerows(asdict(result) for result in results)
+
+
+def format_result(result, budget=None):
+    """Return a one-line summary of the result."""
+    status = 'ok' if result.passed else 'FAIL'
+    if budget is not None and result.wall_time > budget:
+        status += ' SLOW'
+
+    line = (
+        f'{result.year} Day {result.day:2d} {result.part:<28}'
+        f'{result.wall_time:9.3f}s {result.peak_rss / 2**20:9.1f} MiB'
+    )
+    if result.tracemalloc_peak is not None:
+        line += f' {result.tracemalloc_peak / 2**20:9.1f} MiB traced'
+
+    line += f'  {status}'
+    if result.error:
+        line += f'  {result.error}'
+
+    return line
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog='python -m aoc.runner',
+        description=__doc__.split('\n\n', maxsplit=1)[0],
+    )
+    parser.add_argument(
+        'patterns', nargs='*', metavar='PATTERN',
+        help='glob matched against "YYYY/Day N: Title" (default: all)',
+    )
+    parser.add_argument('--json', metavar='FILE', help='write a JSON report')
+    parser.add_argument('--csv', metavar='FILE', help='write a CSV report')
+    parser.add_argument(
+        '--tracemalloc', action='store_true',
+        help='also record the tracemalloc peak (slows down the run)',
+    )
+    parser.add_argument(
+        '--budget', type=float, metavar='SECONDS',
+        help='flag the parts that take longer than the budget',
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1, metavar='N',
+        help='number of worker processes (default: 1, 0 for all cores)',
+    )
+    parser.add_argument(
+        '--history', metavar='FILE',
+        help='JSON report of a previous run to start the slowest parts first',
+    )
+    parser.add_argument(
+        '--list', action='store_true', help='list the parts and exit',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main entry."""
+    args = parse_args(argv)
+    parts = [
+        part
+        for path in discover(args.patterns)
+        for part in iter_parts(path)
+    ]
+    if args.history:
+        parts = schedule(parts, load_timings(args.history))
+
+    if args.list:
+        for part in parts:
+            print(part)
+        return 0
+
+    order = {part.key: i for i, part in enumerate(parts)}
+    results = []
+    start = time.perf_counter()
+    for result in run(parts, args.tracemalloc, args.jobs or os.cpu_count()):
+        print(format_result(result, args.budget), flush=True)
+        results.append(result)
+
+    elapsed = time.perf_counter() - start
+    results.sort(key=lambda result: order[result.key])
+    total = sum(result.wall_time for result in results)
+    failed = sum(not result.passed for result in results)
+    print(
+        f'{len(results)} parts in {total:.3f}s '
+        f'({elapsed:.3f}s elapsed), {failed} failed'
+    )
+
+    if args.json:
+        write_json(results, args.json)
+    if args.csv:
+        write_csv(results, args.csv)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""Graph searches over integer-encoded states.
+
+A puzzle only has to number its states ``0 <= state < size`` and
+provide a neighbors function. The searches keep their bookkeeping in
+flat lists indexed by state and support several sources at once, an
+early exit on reaching a target, A* heuristics, a bucket queue for
+small integer weights and the DAG of all shortest paths.
+"""
+
+
+import math
+import random
+from collections import deque
+from heapq import heappop, heappush
+from typing import NamedTuple
+
+
+UNREACHED = -1
+
+
+class SearchResult(NamedTuple):
+    """The outcome of a search.
+
+    `distances` holds the distance of every state, UNREACHED for the
+    states never reached. `target` is the first target state settled,
+    if any. `parents` holds, when requested, the list of predecessors
+    of every state on all of its shortest paths, none for the sources.
+    """
+
+    distances: list
+    target: int | None
+    parents: list | None
+
+
+def bfs(neighbors, sources, size, is_target=None, parents=False):
+    """Search breadth-first from the sources, where `neighbors(state)`
+    returns the states one step away.
+    """
+    distances = [UNREACHED] * size
+    preds = [[] for _ in range(size)] if parents else None
+    queue = deque()
+    for source in sources:
+        if distances[source] == UNREACHED:
+            distances[source] = 0
+            queue.append(source)
+
+    while queue:
+        state = queue.popleft()
+        if is_target is not None and is_target(state):
+            return SearchResult(distances, state, preds)
+
+        dist = distances[state] + 1
+        for next_state in neighbors(state):
+            if distances[next_state] == UNREACHED:
+                distances[next_state] = dist
+                queue.append(next_state)
+            elif distances[next_state] != dist:
+                continue
+
+            if parents:
+                preds[next_state].append(state)
+
+    return SearchResult(distances, None, preds)
+
+
+def dijkstra(neighbors, sources, size, is_target=None, heuristic=None,
+             max_weight=None, parents=False):
+    """Search for the shortest paths from the sources, where
+    `neighbors(state)` returns pairs of next state and non-negative
+    integer weight.
+
+    With a `heuristic(state)` that never overestimates the remaining
+    distance this is A*. Without one, a `max_weight` bounding every
+    weight replaces the heap with a circular bucket queue.
+    """
+    if max_weight is not None and heuristic is None:
+        return _dial(neighbors, sources, size, is_target, max_weight, parents)
+
+    sources = set(sources)
+    distances = [UNREACHED] * size
+    settled = bytearray(size)
+    preds = [[] for _ in range(size)] if parents else None
+    queue = []
+    for source in sources:
+        distances[source] = 0
+        heappush(queue, (heuristic(source) if heuristic else 0, 0, source))
+
+    while queue:
+        _, dist, state = heappop(queue)
+        if settled[state] or dist != distances[state]:
+            continue
+
+        settled[state] = 1
+        if is_target is not None and is_target(state):
+            return SearchResult(distances, state, preds)
+
+        for next_state, weight in neighbors(state):
+            next_dist = dist + weight
+            known = distances[next_state]
+            if known == UNREACHED or next_dist < known:
+                distances[next_state] = next_dist
+                if parents:
+                    preds[next_state] = [state]
+                priority = next_dist
+                if heuristic:
+                    priority += heuristic(next_state)
+                heappush(queue, (priority, next_dist, next_state))
+            elif (parents and next_dist == known
+                  and next_state not in sources):
+                preds[next_state].append(state)
+
+    return SearchResult(distances, None, preds)
+
+
+def _dial(neighbors, sources, size, is_target, max_weight, parents):
+    distances = [UNREACHED] * size
+    settled = bytearray(size)
+    preds = [[] for _ in range(size)] if parents else None
+    sources = set(sources)
+    buckets = [[] for _ in range(max_weight + 1)]
+    pending = 0
+    for source in sources:
+        distances[source] = 0
+        buckets[0].append(source)
+        pending += 1
+
+    dist = 0
+    while pending:
+        bucket = buckets[dist % len(buckets)]
+        while bucket:
+            state = bucket.pop()
+            pending -= 1
+            if settled[state] or distances[state] != dist:
+                continue
+
+            settled[state] = 1
+            if is_target is not None and is_target(state):
+                return SearchResult(distances, state, preds)
+
+            for next_state, weight in neighbors(state):
+                next_dist = dist + weight
+                known = distances[next_state]
+                if known == UNREACHED or next_dist < known:
+                    distances[next_state] = next_dist
+                    if parents:
+                        preds[next_state] = [state]
+                    buckets[next_dist % len(buckets)].append(next_state)
+                    pending += 1
+                elif (parents and next_dist == known
+                      and next_state not in sources):
+                    preds[next_state].append(state)
+
+        dist += 1
+
+    return SearchResult(distances, None, preds)
+
+
+def path(parents, target):
+    """Return one shortest path from a source to the target."""
+    states = [target]
+    while parents[target]:
+        target = parents[target][0]
+        states.append(target)
+
+    return states[::-1]
+
+
+def on_shortest_paths(parents, targets):
+    """Return the set of states on any shortest path to the targets."""
+    states = set(targets)
+    stack = list(states)
+    while stack:
+        for parent in parents[stack.pop()]:
+            if parent not in states:
+                states.add(parent)
+                stack.append(parent)
+
+    return states
+
+
+def _random_graph(rng, size, max_weight):
+    graph = []
+    for _ in range(size):
+        targets = rng.sample(range(size), rng.randrange(min(size, 4) + 1))
+        graph.append([
+            (target, rng.randrange(max_weight + 1)) for target in targets
+        ])
+    return graph
+
+
+def _bellman_ford(graph, sources):
+    distances = [math.inf] * len(graph)
+    for source in sources:
+        distances[source] = 0
+
+    for _ in graph:
+        for state, edges in enumerate(graph):
+            for next_state, weight in edges:
+                distances[next_state] = min(
+                    distances[next_state], distances[state] + weight,
+                )
+
+    return [UNREACHED if d == math.inf else d for d in distances]
+
+
+def _expected_parents(graph, distances, sources):
+    parents = [set() for _ in graph]
+    for state, edges in enumerate(graph):
+        for next_state, weight in edges:
+            if (next_state not in sources
+                    and distances[state] != UNREACHED
+                    and distances[state] + weight == distances[next_state]):
+                parents[next_state].add(state)
+    return parents
+
+
+def _check_parents(parents, expected):
+    assert [sorted(preds) for preds in parents] == [
+        sorted(preds) for preds in expected
+    ]
+
+
+def test_bfs():
+    """Test bfs against Bellman-Ford on unit weights."""
+    rng = random.Random(0)
+    for _ in range(200):
+        size = rng.randrange(1, 12)
+        graph = [
+            [(state, 1) for state, _ in edges]
+            for edges in _random_graph(rng, size, 1)
+        ]
+        sources = rng.sample(range(size), min(size, rng.randrange(1, 3)))
+        expected = _bellman_ford(graph, sources)
+        result = bfs(
+            lambda state, graph=graph: [s for s, _ in graph[state]],
+            sources, size, parents=True,
+        )
+        assert result.distances == expected
+        assert result.target is None
+        _check_parents(
+            result.parents, _expected_parents(graph, expected, sources),
+        )
+
+
+def test_dijkstra():
+    """Test the heap and bucket queue searches against Bellman-Ford."""
+    rng = random.Random(1)
+    for _ in range(200):
+        size = rng.randrange(1, 12)
+        max_weight = rng.randrange(1, 10)
+        graph = _random_graph(rng, size, max_weight)
+        sources = rng.sample(range(size), min(size, rng.randrange(1, 3)))
+        expected = _bellman_ford(graph, sources)
+        for bound in None, max_weight:
+            result = dijkstra(
+                graph.__getitem__, sources, size,
+                max_weight=bound, parents=True,
+            )
+            assert result.distances == expected
+            _check_parents(
+                result.parents,
+                _expected_parents(graph, expected, sources),
+            )
+            for state, dist in enumerate(expected):
+                if dist != UNREACHED:
+                    states = path(result.parents, state)
+                    assert states[0] in sources and states[-1] == state
+                    assert sum(
+                        dict(graph[a])[b] for a, b in zip(states, states[1:])
+                    ) == dist
+
+
+def test_a_star():
+    """Test A* with a consistent heuristic and an early exit."""
+    rng = random.Random(2)
+    for _ in range(200):
+        size = rng.randrange(2, 12)
+        graph = _random_graph(rng, size, 9)
+        source, target = rng.sample(range(size), 2)
+        expected = _bellman_ford(graph, [source])
+        reverse = [[] for _ in graph]
+        for state, edges in enumerate(graph):
+            for next_state, weight in edges:
+                reverse[next_state].append((state, weight))
+        remaining = _bellman_ford(reverse, [target])
+
+        def heuristic(state, remaining=remaining):
+            return max(remaining[state], 0) // 2
+
+        result = dijkstra(
+            graph.__getitem__, [source], size,
+            is_target=target.__eq__, heuristic=heuristic,
+        )
+        if expected[target] == UNREACHED:
+            assert result.target is None
+        else:
+            assert result.target == target
+            assert result.distances[target] == expected[target]
+
+
+def test_on_shortest_paths():
+    """Test the states on the shortest paths to several targets."""
+    graph = [[(1, 1), (2, 1)], [(3, 1)], [(3, 1)], [(4, 5)], []]
+    result = dijkstra(graph.__getitem__, [0], len(graph), parents=True)
+    assert on_shortest_paths(result.parents, [3]) == {0, 1, 2, 3}
+    assert on_shortest_paths(result.parents, [1, 4]) == {0, 1, 2, 3, 4}
+    assert on_shortest_paths(result.parents, [0]) == {0}